@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Uses ppackage from day-5 (pip install day-5/primesapp), or the source tree
+try:
+    import ppackage
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "day-5", "primesapp"))
+    import ppackage
+
+def all_primes_serial(limit, workers):
+    return ppackage.getAllPrimes(2, limit)
+
+def all_primes_threads(limit, workers):
+    # Same split as the process version, but threads share one GIL while sieving
+    size = -(-(limit - 1) // workers)
+    ranges = [(start, min(limit, start + size - 1)) for start in range(2, limit + 1, size)]
+    primes = []
+    with ThreadPoolExecutor(workers) as executor:
+        for _, part in executor.map(lambda r: ppackage.getAllPrimes(*r), ranges):
+            primes.extend(part)
+    return len(primes), primes
+
+def all_primes_processes(limit, workers):
+    return ppackage.getAllPrimes(2, limit, workers=workers)
+
+def run(name, function, limit, workers):
+    start = time.time()
+    count, primes = function(limit, workers)
+    elapsed = time.time() - start
+    print(f"{name:<14} {count:>12} primes in {elapsed:7.2f} seconds")
+    return elapsed, primes[-1] if primes else None
+
+def main():
+    limit = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10 ** 8
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    print(f"Counting primes up to {limit:,} with {workers} workers...")
+
+    serial, expected = run("serial", all_primes_serial, limit, workers)
+    for name, function in [("thread pool", all_primes_threads), ("process pool", all_primes_processes)]:
+        elapsed, last = run(name, function, limit, workers)
+        assert last == expected, f"{name} disagrees with the serial result"
+        print(f"{'':<14} speedup x{serial / elapsed:.2f}")
+
+    start = time.time()
+    highest = ppackage.getHighestPrime(2, limit, workers=workers)
+    print(f"Highest prime up to {limit:,}: {highest} ({time.time() - start:.2f} seconds)")
+
+# The guard is required: worker processes re-import this file on Windows/macOS
+if __name__ == "__main__":
+    main()
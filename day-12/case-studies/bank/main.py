@@ -9,6 +9,7 @@ def menu():
     print("5. Withdraw")
     print("6. Delete Account")
     print("7. List All Accounts")
+    print("8. Find Accounts by Email")
     print("0. Exit")
 
 def main():
@@ -62,6 +63,14 @@ def main():
             for acc in accounts:
                 print(acc)
 
+        elif choice == "8":
+            email = input("Email: ")
+            accounts = service.find_by_email(email)
+            for acc in accounts:
+                print(vars(acc))
+            if not accounts:
+                print("No accounts found.")
+
         elif choice == "0":
             break
         else:
@@ -1,62 +1,168 @@
+import os
+
 from models.account import Account
 from storage.file_store import FileStore
 
+# "json" (default) or "sqlite"; can also be set with the BANK_STORE variable.
+STORE_BACKEND = os.environ.get("BANK_STORE", "json")
+
+def make_store(backend=None):
+    backend = backend or STORE_BACKEND
+    if backend == "json":
+        return FileStore()
+    if backend == "sqlite":
+        from storage.sqlite_store import SqliteStore
+        return SqliteStore()
+    raise ValueError(f"Unknown store backend: {backend}")
+
 class BankService:
     
-    def __init__(self):
-        self.store = FileStore()
+    def __init__(self, store=None):
+        self.store = store or make_store()
+        # A row-level store (SqliteStore) can be changed by other processes at
+        # any time, so every check and write goes to the store and the indexes
+        # below only cache what was last read from it. Other stores (FileStore)
+        # belong to this process: loaded once, indexed, and written back whole.
+        self.row_level = getattr(self.store, "row_level", False)
+        self._by_acc_no = {}
+        self._by_email = {}
+        if not self.row_level:
+            self.reload()
+
+    # Records are loaded once and kept in two indexes: acc_no -> record, and
+    # email -> acc_nos (one person may hold a savings and a current account).
+    # Dicts keep insertion order, so saving writes the file in the same order.
+    def reload(self):
+        self._by_acc_no = {}
+        self._by_email = {}
+        for acc in self.store.load_accounts():
+            self._index(acc)
+
+    @staticmethod
+    def _email_key(email):
+        return email.strip().lower()
+
+    def _index(self, acc):
+        self._by_acc_no[acc["acc_no"]] = acc
+        self._by_email.setdefault(self._email_key(acc["email"]), {})[acc["acc_no"]] = None
+
+    def _unindex_email(self, acc):
+        key = self._email_key(acc["email"])
+        owners = self._by_email.get(key)
+        if owners is not None:
+            owners.pop(acc["acc_no"], None)
+            if not owners:
+                del self._by_email[key]
+
+    def _forget(self, acc_no):
+        acc = self._by_acc_no.pop(acc_no, None)
+        if acc is not None:
+            self._unindex_email(acc)
+        return acc
+
+    def _refresh(self, acc_no):
+        # Re-reads one account from a row-level store into the indexes
+        self._forget(acc_no)
+        acc = self.store.get(acc_no)
+        if acc is not None:
+            self._index(acc)
+        return acc
+
+    def _lookup(self, acc_no):
+        if self.row_level:
+            return self._refresh(acc_no)
+        return self._by_acc_no.get(acc_no)
+
+    def _save(self):
+        self.store.save_accounts(list(self._by_acc_no.values()))
 
     def create_account(self, name, email, acc_type):
         acc = Account(name, email, acc_type)
-        accounts = self.store.load_accounts()
-        accounts.append(acc.to_dict())
-        self.store.save_accounts(accounts)
+        record = acc.to_dict()
+        self._index(record)
+        if self.row_level:
+            self.store.upsert(record)
+        else:
+            self._save()
         return acc.acc_no
 
     def get_account(self, acc_no):
-        accounts = self.store.load_accounts()
-        for acc in accounts:
-            if acc["acc_no"] == acc_no:
-                return Account.from_dict(acc)
-        return None
+        acc = self._lookup(acc_no)
+        return Account.from_dict(acc) if acc else None
+
+    def find_by_email(self, email):
+        if self.row_level:
+            accounts = self.store.find_by_email(email)
+            for acc in accounts:
+                self._forget(acc["acc_no"])
+                self._index(acc)
+            return [Account.from_dict(acc) for acc in accounts]
+        owners = self._by_email.get(self._email_key(email), {})
+        return [Account.from_dict(self._by_acc_no[acc_no]) for acc_no in owners]
 
     def update_account(self, acc_no, name=None, email=None):
-        accounts = self.store.load_accounts()
-        for acc in accounts:
-            if acc["acc_no"] == acc_no:
-                if name:
-                    acc["name"] = name
-                if email:
-                    acc["email"] = email
-                self.store.save_accounts(accounts)
-                return True
-        return False
+        if self.row_level:
+            # Only the changed fields are written, so edits and balance
+            # changes made by other processes are kept
+            if not self.store.update_details(acc_no, name=name or None, email=email or None):
+                self._forget(acc_no)
+                return False
+            self._refresh(acc_no)
+            return True
+        acc = self._by_acc_no.get(acc_no)
+        if acc is None:
+            return False
+        if name:
+            acc["name"] = name
+        if email:
+            self._unindex_email(acc)
+            acc["email"] = email
+            self._index(acc)
+        self._save()
+        return True
+
+    def _change_balance(self, acc_no, delta):
+        # One guarded UPDATE in the store: the account must exist and the
+        # balance must not go negative
+        balance = self.store.add_to_balance(acc_no, delta)
+        if balance is None:
+            return False
+        cached = self._by_acc_no.get(acc_no)
+        if cached is not None:
+            cached["balance"] = balance
+        return True
 
     def deposit(self, acc_no, amount):
-        accounts = self.store.load_accounts()
-        for acc in accounts:
-            if acc["acc_no"] == acc_no:
-                acc["balance"] += amount
-                self.store.save_accounts(accounts)
-                return True
-        return False
+        if self.row_level:
+            return self._change_balance(acc_no, amount)
+        acc = self._by_acc_no.get(acc_no)
+        if acc is None:
+            return False
+        acc["balance"] += amount
+        self._save()
+        return True
 
     def withdraw(self, acc_no, amount):
-        accounts = self.store.load_accounts()
-        for acc in accounts:
-            if acc["acc_no"] == acc_no and acc["balance"] >= amount:
-                acc["balance"] -= amount
-                self.store.save_accounts(accounts)
-                return True
-        return False
+        if self.row_level:
+            return self._change_balance(acc_no, -amount)
+        acc = self._by_acc_no.get(acc_no)
+        if acc is None or acc["balance"] < amount:
+            return False
+        acc["balance"] -= amount
+        self._save()
+        return True
 
     def delete_account(self, acc_no):
-        accounts = self.store.load_accounts()
-        new_accounts = [acc for acc in accounts if acc["acc_no"] != acc_no]
-        if len(accounts) == len(new_accounts):
+        if self.row_level:
+            self._forget(acc_no)
+            return self.store.delete(acc_no)
+        acc = self._forget(acc_no)
+        if acc is None:
             return False
-        self.store.save_accounts(new_accounts)
+        self._save()
         return True
 
     def list_accounts(self):
-        return self.store.load_accounts()
+        if self.row_level:
+            self.reload()
+        return [dict(acc) for acc in self._by_acc_no.values()]
@@ -0,0 +1,110 @@
+import os
+import sqlite3
+
+DB_FILE = "data/accounts.db"
+
+class SqliteStore:
+    
+    # Same load_accounts/save_accounts surface as FileStore, plus row-level
+    # operations so a single change does not rewrite the whole dataset.
+    # WAL lets readers run while another process writes. BankService sees
+    # row_level and reads and writes through these operations instead of
+    # trusting what it loaded at startup.
+    row_level = True
+
+    def __init__(self, path=DB_FILE):
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS accounts ("
+            " acc_no TEXT PRIMARY KEY,"
+            " name TEXT NOT NULL,"
+            " email TEXT NOT NULL,"
+            " acc_type TEXT NOT NULL,"
+            " balance REAL NOT NULL DEFAULT 0)"
+        )
+        # Emails are matched case-insensitively, like BankService.find_by_email
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_accounts_email_key ON accounts(lower(trim(email)))")
+
+    def close(self):
+        self.conn.close()
+
+    def load_accounts(self):
+        rows = self.conn.execute("SELECT acc_no, name, email, acc_type, balance FROM accounts ORDER BY rowid")
+        return [dict(row) for row in rows]
+
+    def save_accounts(self, accounts):
+        with self._transaction():
+            self.conn.execute("DELETE FROM accounts")
+            self.conn.executemany(
+                "INSERT INTO accounts (acc_no, name, email, acc_type, balance)"
+                " VALUES (:acc_no, :name, :email, :acc_type, :balance)",
+                accounts,
+            )
+
+    def get(self, acc_no):
+        row = self.conn.execute(
+            "SELECT acc_no, name, email, acc_type, balance FROM accounts WHERE acc_no = ?", (acc_no,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def find_by_email(self, email):
+        rows = self.conn.execute(
+            "SELECT acc_no, name, email, acc_type, balance FROM accounts"
+            " WHERE lower(trim(email)) = ? ORDER BY rowid",
+            (email.strip().lower(),),
+        )
+        return [dict(row) for row in rows]
+
+    def update_details(self, acc_no, name=None, email=None):
+        # Only the given fields change; the balance is never written here,
+        # so an edit cannot undo another process's deposit
+        return self.conn.execute(
+            "UPDATE accounts SET name = coalesce(?, name), email = coalesce(?, email) WHERE acc_no = ?",
+            (name, email, acc_no),
+        ).rowcount > 0
+
+    def upsert(self, account):
+        self.conn.execute(
+            "INSERT INTO accounts (acc_no, name, email, acc_type, balance)"
+            " VALUES (:acc_no, :name, :email, :acc_type, :balance)"
+            " ON CONFLICT(acc_no) DO UPDATE SET"
+            " name = excluded.name, email = excluded.email,"
+            " acc_type = excluded.acc_type, balance = excluded.balance",
+            account,
+        )
+
+    def delete(self, acc_no):
+        return self.conn.execute("DELETE FROM accounts WHERE acc_no = ?", (acc_no,)).rowcount > 0
+
+    def add_to_balance(self, acc_no, delta):
+        # Done in SQL so two processes depositing at once cannot lose an update.
+        # Returns the new balance, or None if the account is missing or the
+        # balance would go negative.
+        with self._transaction():
+            updated = self.conn.execute(
+                "UPDATE accounts SET balance = balance + ? WHERE acc_no = ? AND balance + ? >= 0",
+                (delta, acc_no, delta),
+            ).rowcount
+            if not updated:
+                return None
+            return self.conn.execute("SELECT balance FROM accounts WHERE acc_no = ?", (acc_no,)).fetchone()[0]
+
+    def _transaction(self):
+        return _Transaction(self.conn)
+
+class _Transaction:
+    
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
@@ -1,18 +1,114 @@
 import json
 import uuid
 import os
-from typing import Dict
+from typing import Dict, List, Tuple
 from .models import Account
-from .security import hash_pin, verify_pin
+from .security import hash_pin, verify_pin, verify_pins
 
 DATA_FILE = "accounts.json"
 PIN_MAP_FILE = "pin_hashes.json"
 
+# Every mutation is appended here as one JSON line; the two files above are
+# the snapshot the journal is replayed on top of.
+JOURNAL_FILE = "accounts.journal"
+COMPACT_EVERY = 1000  # journal entries before they are folded into the snapshot
+
 accounts: Dict[str, Account] = {}
 pin_map: Dict[str, str] = {}
+journal_entries = 0
+
+# load_data() skips reparsing while the on-disk files keep the same identity.
+_file_identity = None
+cache_hits = 0
+cache_misses = 0
+
+def _identity():
+    ident = []
+    for path in (DATA_FILE, PIN_MAP_FILE, JOURNAL_FILE):
+        try:
+            st = os.stat(path)
+            ident.append((os.path.abspath(path), st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            ident.append((os.path.abspath(path), None, None))
+    return tuple(ident)
+
+def _remember_own_write(was_fresh: bool):
+    # Our own writes should not force a reload, but only if nobody else
+    # touched the files since we last read them.
+    global _file_identity
+    _file_identity = _identity() if was_fresh else None
+
+def invalidate_cache():
+    global _file_identity
+    _file_identity = None
+
+def cache_stats() -> dict:
+    return {"hits": cache_hits, "misses": cache_misses}
+
+def _apply(entry: dict):
+    # Entries carry the full account state, so replaying one twice is harmless.
+    record = entry["account"]
+    accounts[record["account_id"]] = Account(**record)
+    if "pin_hash" in entry:
+        pin_map[record["account_id"]] = entry["pin_hash"]
+
+def _replay_journal():
+    global journal_entries
+    journal_entries = 0
+    if not os.path.exists(JOURNAL_FILE):
+        return
+    good_offset = 0
+    with open(JOURNAL_FILE, "rb") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            if not line.endswith(b"\n"):
+                break
+            _apply(entry)
+            good_offset += len(line)
+            journal_entries += 1
+    # Drop a torn tail left by a crash mid-append, otherwise the next append
+    # would be glued onto it.
+    if good_offset != os.path.getsize(JOURNAL_FILE):
+        with open(JOURNAL_FILE, "r+b") as f:
+            f.truncate(good_offset)
+
+def _append(acc: Account, pin_hash: str = None):
+    entry = {"account": vars(acc)}
+    if pin_hash is not None:
+        entry["pin_hash"] = pin_hash
+    _append_entries([entry])
+
+def _append_entries(entries: List[dict]):
+    global journal_entries
+    was_fresh = _identity() == _file_identity
+    with open(JOURNAL_FILE, "a") as f:
+        f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        f.flush()
+        os.fsync(f.fileno())
+    journal_entries += len(entries)
+    if journal_entries >= COMPACT_EVERY:
+        save_data()
+    _remember_own_write(was_fresh)
+
+def _write_atomic(path: str, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
 
 def load_data():
-    global accounts, pin_map
+    global accounts, pin_map, _file_identity, cache_hits, cache_misses
+    ident = _identity()
+    if ident == _file_identity:
+        cache_hits += 1
+        return
+    cache_misses += 1
+
     if os.path.exists(DATA_FILE):
         with open(DATA_FILE, "r") as f:
             data = json.load(f)
@@ -26,11 +122,18 @@ def load_data():
     else:
         pin_map = {}
 
+    _replay_journal()
+    _file_identity = ident
+
 def save_data():
-    with open(DATA_FILE, "w") as f:
-        json.dump({k: vars(v) for k, v in accounts.items()}, f, indent=2)
-    with open(PIN_MAP_FILE, "w") as f:
-        json.dump(pin_map, f, indent=2)
+    # Compaction: write a fresh snapshot, then start an empty journal.
+    global journal_entries
+    was_fresh = _identity() == _file_identity
+    _write_atomic(DATA_FILE, {k: vars(v) for k, v in accounts.items()})
+    _write_atomic(PIN_MAP_FILE, pin_map)
+    open(JOURNAL_FILE, "w").close()
+    journal_entries = 0
+    _remember_own_write(was_fresh)
 
 def create_account(name: str, pin: str) -> Account:
     load_data()
@@ -39,14 +142,14 @@ def create_account(name: str, pin: str) -> Account:
     acc = Account(account_id, name)
     accounts[account_id] = acc
     pin_map[account_id] = pin_hash
-    save_data()
+    _append(acc, pin_hash)
     return acc
 
 def authenticate(account_id: str, pin: str) -> Account:
     load_data()
     if account_id not in accounts:
         raise ValueError("Account not found.")
-    if not verify_pin(pin, pin_map[account_id]):
+    if not verify_pin(pin, pin_map[account_id], account_id):
         raise ValueError("Invalid PIN.")
     return accounts[account_id]
 
@@ -54,23 +157,63 @@ def deposit(account_id: str, pin: str, amount: float) -> Account:
     acc = authenticate(account_id, pin)
     acc.deposit(amount)
     accounts[account_id] = acc
-    save_data()
+    _append(acc)
     return acc
 
 def withdraw(account_id: str, pin: str, amount: float) -> Account:
     acc = authenticate(account_id, pin)
     acc.withdraw(amount)
     accounts[account_id] = acc
-    save_data()
+    _append(acc)
     return acc
 
 def update_name(account_id: str, pin: str, new_name: str) -> Account:
     acc = authenticate(account_id, pin)
     acc.name = new_name
     accounts[account_id] = acc
-    save_data()
+    _append(acc)
     return acc
 
 def list_accounts():
     load_data()
     return list(accounts.values())
+
+def apply_batch(batch: Dict[str, List[Tuple[str, float]]], pins: Dict[str, str]) -> Tuple[int, List[str]]:
+    # batch maps account_id -> [(kind, amount), ...] in file order. Each account
+    # is authenticated once, everything is applied in memory and the changed
+    # accounts are written to the journal in a single append.
+    load_data()
+    errors = []
+    known = [acc_id for acc_id in batch if acc_id in accounts]
+    for acc_id in batch:
+        if acc_id not in accounts:
+            errors.append(f"{acc_id}: Account not found.")
+    checks = [(pins.get(acc_id, ""), pin_map[acc_id], acc_id) for acc_id in known]
+    verified = verify_pins(checks)
+
+    applied = 0
+    changed = []
+    for acc_id, ok in zip(known, verified):
+        if not ok:
+            errors.append(f"{acc_id}: Invalid PIN.")
+            continue
+        acc = accounts[acc_id]
+        applied_before = applied
+        for kind, amount in batch[acc_id]:
+            try:
+                if kind == "deposit":
+                    acc.deposit(amount)
+                elif kind == "withdraw":
+                    acc.withdraw(amount)
+                else:
+                    raise ValueError(f"Unknown transaction type '{kind}'.")
+                applied += 1
+            except ValueError as e:
+                errors.append(f"{acc_id}: {e}")
+        # Accounts whose transactions all failed are unchanged; nothing to journal
+        if applied > applied_before:
+            changed.append({"account": vars(acc)})
+
+    if changed:
+        _append_entries(changed)
+    return applied, errors
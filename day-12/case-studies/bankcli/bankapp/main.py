@@ -1,3 +1,7 @@
+import csv
+import json
+import time
+from pathlib import Path
 import typer
 from rich.console import Console
 from rich.prompt import Prompt
@@ -61,3 +65,71 @@ def list_all():
         table.add_row(acc.account_id, acc.name, f"₹{acc.balance:.2f}")
 
     console.print(table)
+
+def _parse_transaction(row):
+    return str(row["account_id"]), str(row["type"]).strip().lower(), float(row["amount"]), row.get("pin")
+
+def _read_transactions(path: Path):
+    # CSV with a header row, or JSON Lines; both need account_id, type and
+    # amount, and may carry a pin so the run does not have to prompt for it.
+    # Yields (line number, transaction, error): a row that cannot be parsed
+    # comes back with its error instead of stopping the whole file.
+    with open(path, newline="") as f:
+        if path.suffix.lower() in (".jsonl", ".ndjson"):
+            for number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield number, _parse_transaction(json.loads(line)), None
+                except (KeyError, TypeError, ValueError) as e:
+                    yield number, None, e
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                try:
+                    yield reader.line_num, _parse_transaction(row), None
+                except (KeyError, TypeError, ValueError) as e:
+                    yield reader.line_num, None, e
+
+def _row_error(number, error):
+    if isinstance(error, KeyError):
+        return f"Line {number}: missing {error}"
+    return f"Line {number}: {error}"
+
+@app.command(name="apply")
+def apply(path: Path):
+    batch = {}
+    pins = {}
+    total = 0
+    row_errors = []
+    try:
+        for number, transaction, error in _read_transactions(path):
+            total += 1
+            if error is not None:
+                row_errors.append(_row_error(number, error))
+                continue
+            account_id, kind, amount, pin = transaction
+            batch.setdefault(account_id, []).append((kind, amount))
+            if pin:
+                pins[account_id] = str(pin)
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        console.print(f"[bold red]❌ Error reading {path}:[/bold red] {e}")
+        raise typer.Exit(1)
+
+    for account_id in batch:
+        if account_id not in pins:
+            pins[account_id] = Prompt.ask(f"[bold green]Enter PIN for {account_id}[/bold green]", password=True)
+
+    # Timed from here, so time spent typing PINs does not count
+    start = time.perf_counter()
+    try:
+        applied, errors = db.apply_batch(batch, pins)
+    except Exception as e:
+        console.print(f"[bold red]❌ Error:[/bold red] {e}")
+        raise typer.Exit(1)
+
+    elapsed = time.perf_counter() - start
+    for error in row_errors + errors:
+        console.print(f"[bold red]❌[/bold red] {error}")
+    console.print(f"[bold green]✅ Applied {applied}/{total} transactions[/bold green] across {len(batch)} accounts")
+    console.print(f"[cyan]Throughput:[/cyan] {applied / elapsed if elapsed else 0:.0f} applied tx/s ({elapsed:.2f}s)")
@@ -1,7 +1,81 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
 import bcrypt # pip install bcrypt
 
+# Successful checks are remembered briefly so repeated operations on the same
+# account skip bcrypt. The PIN itself is never stored: entries are keyed by an
+# HMAC under a per-process random key and tied to the hash they were checked
+# against, so a PIN change invalidates them even without invalidate_pin().
+VERIFY_CACHE_TTL = 60.0
+VERIFY_CACHE_SIZE = 1024
+HASH_WORKERS = min(8, os.cpu_count() or 1)
+
+_cache_key = os.urandom(32)
+_verified: "OrderedDict[Tuple[str, bytes], Tuple[str, float]]" = OrderedDict()
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
 def hash_pin(pin: str) -> str:
     return bcrypt.hashpw(pin.encode(), bcrypt.gensalt()).decode()
 
-def verify_pin(pin: str, pin_hash: str) -> bool:
-    return bcrypt.checkpw(pin.encode(), pin_hash.encode())
+def _pin_digest(pin: str) -> bytes:
+    return hmac.new(_cache_key, pin.encode(), hashlib.sha256).digest()
+
+def verify_pin(pin: str, pin_hash: str, account_id: Optional[str] = None) -> bool:
+    if account_id is None:
+        return bcrypt.checkpw(pin.encode(), pin_hash.encode())
+
+    key = (account_id, _pin_digest(pin))
+    now = time.monotonic()
+    with _lock:
+        cached = _verified.get(key)
+        if cached is not None:
+            if cached[0] == pin_hash and cached[1] > now:
+                _verified.move_to_end(key)
+                return True
+            del _verified[key]
+
+    ok = bcrypt.checkpw(pin.encode(), pin_hash.encode())
+    if ok:
+        with _lock:
+            _verified[key] = (pin_hash, now + VERIFY_CACHE_TTL)
+            _verified.move_to_end(key)
+            while len(_verified) > VERIFY_CACHE_SIZE:
+                _verified.popitem(last=False)
+    return ok
+
+def invalidate_pin(account_id: Optional[str] = None):
+    with _lock:
+        if account_id is None:
+            _verified.clear()
+            return
+        for key in [k for k in _verified if k[0] == account_id]:
+            del _verified[key]
+
+def _get_executor() -> ThreadPoolExecutor:
+    # bcrypt releases the GIL while hashing, so threads do run in parallel.
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+        return _executor
+
+def verify_pins(checks: Iterable[Tuple[str, str, Optional[str]]]) -> List[bool]:
+    # checks: (pin, pin_hash, account_id) triples, verified concurrently.
+    return list(_get_executor().map(lambda c: verify_pin(*c), checks))
+
+async def verify_pin_async(pin: str, pin_hash: str, account_id: Optional[str] = None) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), verify_pin, pin, pin_hash, account_id)
+
+async def hash_pin_async(pin: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), hash_pin, pin)
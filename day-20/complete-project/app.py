@@ -1,14 +1,36 @@
 # fastapi_app.py
+import asyncio
+import os
+import threading
+from contextlib import asynccontextmanager
+from operator import attrgetter
+from typing import List, Optional
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+import numpy as np
 import pandas as pd
-import pickle
 
-# Load model
-with open("artifacts/heart_pipeline.pkl", "rb") as f:
-    model = pickle.load(f)
+from model_registry import ModelRegistry
+
+# train-save.py writes the .joblib; the .pkl is only used until it exists
+MODEL_PATH = os.environ.get("MODEL_PATH") or [
+    "artifacts/heart_pipeline.joblib", "artifacts/heart_pipeline.pkl"]
+
+# Feature names used during model training, in column order
+FEATURE_NAMES = [
+    "age", "sex", "cp", "trestbps", "chol",
+    "fbs", "restecg", "thalach", "exang",
+    "oldpeak", "slope", "ca", "thal"
+]
 
-app = FastAPI(title="Heart Disease Prediction API")
+# Micro-batching of concurrent /predict calls (off unless MICRO_BATCH=1):
+# requests arriving within MICRO_BATCH_WAIT_MS of each other, up to
+# MICRO_BATCH_MAX_ROWS, are scored together in one model call.
+MICRO_BATCH = os.environ.get("MICRO_BATCH", "0") == "1"
+MICRO_BATCH_WAIT_MS = float(os.environ.get("MICRO_BATCH_WAIT_MS", "5"))
+MICRO_BATCH_MAX_ROWS = int(os.environ.get("MICRO_BATCH_MAX_ROWS", "64"))
 
 # Input schema
 class HeartData(BaseModel):
@@ -27,35 +49,201 @@ class HeartData(BaseModel):
     thal: int
 
 
-@app.post("/predict")
-def predict(data: HeartData):
-    # Feature names used during model training
-    feature_names = [
-        "age", "sex", "cp", "trestbps", "chol",
-        "fbs", "restecg", "thalach", "exang",
-        "oldpeak", "slope", "ca", "thal"
-    ]
-
-    # Convert input into DataFrame
-    features = pd.DataFrame([[
-        data.age, data.sex, data.cp, data.trestbps, data.chol,
-        data.fbs, data.restecg, data.thalach, data.exang,
-        data.oldpeak, data.slope, data.ca, data.thal
-    ]], columns=feature_names)
-
-    # Prediction
-    prediction = model.predict(features)[0]
-
-    # Probability (if model supports it)
-    try:
-        probability = float(model.predict_proba(features)[0][1])
-    except AttributeError:
-        probability = None
+# Pulls the features out of a HeartData in training column order
+extract_features = attrgetter(*FEATURE_NAMES)
+
+
+def to_row(data: HeartData):
+    return list(extract_features(data))
+
+
+class LinearFastPath:
+    # StandardScaler followed by a binary LogisticRegression is a single affine
+    # map plus a sigmoid: coef * (x - mean) / scale + intercept. Folding the
+    # scaler into the weights lets a request be scored with one dot product,
+    # without building a DataFrame or going through the sklearn pipeline.
+    def __init__(self, weights, bias: float, classes):
+        self.weights = weights
+        self.bias = bias
+        self.classes = classes
+        self._local = threading.local()
+
+    @classmethod
+    def from_pipeline(cls, pipeline) -> Optional["LinearFastPath"]:
+        from sklearn.linear_model import LogisticRegression, SGDClassifier
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+
+        if not isinstance(pipeline, Pipeline) or len(pipeline.steps) != 2:
+            return None
+        scaler, clf = pipeline.steps[0][1], pipeline.steps[1][1]
+        if not isinstance(scaler, StandardScaler):
+            return None
+        # SGDClassifier with log loss (what train-save.py --incremental saves)
+        # has the same sigmoid-of-a-linear-score probabilities
+        if not (isinstance(clf, LogisticRegression) or
+                (isinstance(clf, SGDClassifier) and clf.loss == "log_loss")):
+            return None
+        if clf.coef_.shape != (1, len(FEATURE_NAMES)):
+            return None
 
-    result = "Heart Disease Detected" if prediction == 1 else "No Heart Disease"
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(len(FEATURE_NAMES))
+        scale = scaler.scale_ if scaler.with_std else np.ones(len(FEATURE_NAMES))
+        coef = clf.coef_[0]
+        weights = np.ascontiguousarray(coef / scale, dtype=np.float64)
+        bias = float(clf.intercept_[0] - np.dot(coef, mean / scale))
+        fast_path = cls(weights, bias, clf.classes_)
+        # Any failure here means no fast path: the sklearn pipeline still serves
+        try:
+            return fast_path if fast_path.matches(pipeline, mean, scale) else None
+        except Exception:
+            return None
 
+    def matches(self, pipeline, mean, scale) -> bool:
+        # Compare against sklearn on synthetic rows around the training data
+        rng = np.random.default_rng(0)
+        X = mean + rng.standard_normal((256, len(FEATURE_NAMES))) * 3 * scale
+        expected = pipeline.predict_proba(pd.DataFrame(X, columns=FEATURE_NAMES))[:, 1]
+        return bool(np.allclose(self.predict_proba(X), expected, rtol=1e-9, atol=1e-12))
+
+    def predict_proba(self, X):
+        z = X @ self.weights + self.bias
+        return 1.0 / (1.0 + np.exp(-z))
+
+    def score_one(self, data: HeartData) -> dict:
+        # Each worker thread reuses its own preallocated row buffer
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = self._local.row = np.empty(len(FEATURE_NAMES), dtype=np.float64)
+        row[:] = extract_features(data)
+        z = float(np.dot(row, self.weights)) + self.bias
+        return make_result(self.classes[1] if z > 0 else self.classes[0], 1.0 / (1.0 + np.exp(-z)))
+
+
+def make_result(prediction, probability) -> dict:
     return {
         "prediction": int(prediction),
-        "result": result,
-        "probability": probability
+        "result": "Heart Disease Detected" if prediction == 1 else "No Heart Disease",
+        "probability": None if probability is None else float(probability)
     }
+
+
+# The model is loaded on first use and swapped when the artifact file changes;
+# each version gets its fast path built once, at load time.
+registry = ModelRegistry(MODEL_PATH, prepare=lambda model: (model, LinearFastPath.from_pipeline(model)))
+
+
+def score_rows(rows) -> List[dict]:
+    model, fast_path = registry.get()
+    if fast_path is not None:
+        proba = fast_path.predict_proba(np.asarray(rows, dtype=np.float64))
+        return [make_result(fast_path.classes[1] if p > 0.5 else fast_path.classes[0], p) for p in proba]
+
+    # One DataFrame and one model call for the whole matrix. The class comes
+    # from the same probabilities rather than a second predict() pass.
+    features = pd.DataFrame(np.asarray(rows, dtype=np.float64), columns=FEATURE_NAMES)
+    if hasattr(model, "predict_proba"):
+        proba = model.predict_proba(features)
+        predictions = model.classes_[proba.argmax(axis=1)]
+        probabilities = proba[:, 1]
+    else:
+        predictions = model.predict(features)
+        probabilities = [None] * len(predictions)
+
+    return [make_result(prediction, probability) for prediction, probability in zip(predictions, probabilities)]
+
+
+class MicroBatcher:
+    def __init__(self, max_rows: int, wait_ms: float):
+        self.max_rows = max_rows
+        self.wait = wait_ms / 1000
+        self.queue = None
+        self.task = None
+
+    def start(self):
+        # Created here so the queue belongs to the server's event loop
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, row) -> dict:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((row, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.wait
+            while len(batch) < self.max_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                results = await run_in_threadpool(score_rows, [row for row, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+batcher = MicroBatcher(MICRO_BATCH_MAX_ROWS, MICRO_BATCH_WAIT_MS) if MICRO_BATCH else None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the model before taking traffic, off the event loop. If it cannot
+    # be loaded yet, requests retry and /model shows last_error.
+    try:
+        await run_in_threadpool(registry.get)
+    except Exception:
+        pass
+    if batcher is not None:
+        batcher.start()
+    yield
+    if batcher is not None:
+        await batcher.stop()
+
+
+app = FastAPI(title="Heart Disease Prediction API", lifespan=lifespan)
+
+
+@app.post("/predict")
+async def predict(data: HeartData):
+    if batcher is not None:
+        return await batcher.submit(to_row(data))
+    current = registry.get_nowait() or await run_in_threadpool(registry.get)
+    _, fast_path = current
+    if fast_path is not None:
+        # A few microseconds of arithmetic; not worth a thread hop
+        return fast_path.score_one(data)
+    return (await run_in_threadpool(score_rows, [to_row(data)]))[0]
+
+
+@app.post("/predict/batch")
+def predict_batch(data: List[HeartData]):
+    if not data:
+        return []
+    return score_rows([to_row(item) for item in data])
+
+
+@app.get("/model")
+def model_info():
+    return registry.stats()
@@ -0,0 +1,152 @@
+# model_registry.py
+# Lazy, memory-mapped model loading shared by the prediction services.
+#
+# Artifacts saved with save_model() are uncompressed joblib files, so the
+# NumPy arrays inside (tree nodes, coefficients) are loaded with mmap_mode="r":
+# pages come from the OS page cache, are shared by every worker process that
+# maps the same file, and are only read in when touched. Old .pkl artifacts
+# still load, just without the sharing.
+#
+# Because loaded models point into the file, publish a new version by
+# replacing the file (save_model does a rename), never by rewriting it in place.
+import os
+import pickle
+import threading
+import time
+
+import joblib
+
+
+def save_model(model, path):
+    # Write next to the target and rename, so a running service never sees a
+    # half-written file when it picks up the new version.
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    joblib.dump(model, tmp, compress=0)
+    os.replace(tmp, path)
+
+
+def load_model(path):
+    if path.endswith(".pkl"):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    return joblib.load(path, mmap_mode="r")
+
+
+def first_existing(*paths):
+    for path in paths:
+        if os.path.exists(path):
+            return path
+    return paths[0]
+
+
+def _resident_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class ModelRegistry:
+    # get() loads the artifact on first use and then, at most every
+    # check_interval seconds, checks whether the file was replaced. A new
+    # version is swapped in without a restart; if it fails to load, the
+    # current model keeps serving. prepare, if given, turns the loaded model
+    # into whatever get() should return.
+    #
+    # path may also be a list of candidates, most preferred first (say the
+    # .joblib a trainer writes, then an older .pkl). Every check uses the first
+    # that exists, so a newly written preferred file takes over without a
+    # restart.
+    #
+    # get_tagged() also returns a tag naming the artifact the model came from
+    # (inode, mtime and size, the same on every replica sharing the file);
+    # key anything derived from the model's output, like cached predictions,
+    # by that tag rather than by the file currently on disk.
+    def __init__(self, path, prepare=None, check_interval=5.0):
+        self.paths = [path] if isinstance(path, str) else list(path)
+        self.path = self.paths[0]
+        self.prepare = prepare
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._current = None  # (value, tag), replaced as a whole
+        self._identity = None
+        self._next_check = 0.0
+        self.version = 0
+        self.load_seconds = None
+        self.resident_delta_bytes = None
+        self.loaded_at = None
+        self.last_error = None
+
+    def _file_identity(self):
+        path = first_existing(*self.paths)
+        st = os.stat(path)
+        return (path, st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def get(self):
+        return self.get_tagged()[0]
+
+    def get_nowait(self):
+        # The current model if no load or check is due, else None; async code
+        # calls get() in a thread only then, so the event loop never waits on
+        # the disk
+        current = self._current
+        if current is not None and time.monotonic() < self._next_check:
+            return current[0]
+        return None
+
+    def get_tagged(self):
+        now = time.monotonic()
+        current = self._current
+        if current is not None and now < self._next_check:
+            return current
+        with self._lock:
+            if self._current is None or now >= self._next_check:
+                self._next_check = now + self.check_interval
+                try:
+                    identity = self._file_identity()
+                    if identity != self._identity:
+                        self._load(identity)
+                except Exception as e:
+                    self.last_error = repr(e)
+                    if self._current is None:
+                        raise
+            return self._current
+
+    def reload(self):
+        with self._lock:
+            self._load(self._file_identity())
+        return self._current[0]
+
+    def _load(self, identity):
+        rss_before = _resident_bytes()
+        start = time.perf_counter()
+        path = identity[0]
+        model = load_model(path)
+        value = self.prepare(model) if self.prepare else model
+        self.load_seconds = time.perf_counter() - start
+        rss_after = _resident_bytes()
+        if rss_before is not None and rss_after is not None:
+            self.resident_delta_bytes = rss_after - rss_before
+        self._current = (value, "-".join(map(str, identity[1:])))
+        self._identity = identity
+        self.path = path
+        self.version += 1
+        self.loaded_at = time.time()
+        self.last_error = None
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "loaded": self._current is not None,
+            "version": self.version,
+            "tag": self._current[1] if self._current is not None else None,
+            "load_seconds": self.load_seconds,
+            "resident_delta_bytes": self.resident_delta_bytes,
+            "resident_bytes": _resident_bytes(),
+            "loaded_at": self.loaded_at,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,116 @@
+# model_search.py
+# Parallel hyper-parameter search shared by the training scripts.
+#
+# The CV folds are split once, and the preprocessing step (if any) is fitted
+# and applied once per fold rather than once per candidate. The transformed
+# fold arrays are written to a temporary folder as one uncompressed joblib
+# file that every worker process memory-maps, so they are not pickled per
+# task. Each (candidate, fold) pair is a separate task on a process pool and
+# only fits the final estimator, which keeps every core busy.
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import KFold, ParameterGrid, ParameterSampler, StratifiedKFold
+from sklearn.pipeline import Pipeline
+
+# Set in each worker process: one (X_train, y_train, X_test, y_test) per fold
+_folds = None
+
+
+def _load_folds(path):
+    global _folds
+    _folds = joblib.load(path, mmap_mode="r")
+
+
+def _fit_fold(estimator, params, fold, scoring):
+    X_train, y_train, X_test, y_test = _folds[fold]
+    start = time.perf_counter()
+    try:
+        model = clone(estimator).set_params(**params)
+        model.fit(X_train, y_train)
+        seconds = time.perf_counter() - start
+        score = get_scorer(scoring)(model, X_test, y_test) if scoring else model.score(X_test, y_test)
+    except Exception:
+        # A candidate that cannot be fitted (e.g. an invalid parameter
+        # combination) scores NaN and ends up last instead of stopping the search
+        return float("nan"), time.perf_counter() - start
+    return float(score), seconds
+
+
+def candidates(param_grid, n_iter=None, random_state=0):
+    # Every combination, or n_iter random draws (lists are sampled uniformly,
+    # scipy.stats distributions are sampled from)
+    if n_iter is None:
+        return list(ParameterGrid(param_grid))
+    return list(ParameterSampler(param_grid, n_iter, random_state=random_state))
+
+
+def make_folds(X, y, cv, preprocess=None, classifier=False, random_state=0):
+    splitter = (StratifiedKFold if classifier else KFold)(cv, shuffle=True, random_state=random_state)
+    folds = []
+    for train_idx, test_idx in splitter.split(X, y):
+        X_train, X_test = X[train_idx], X[test_idx]
+        if preprocess is not None:
+            step = clone(preprocess).fit(X_train, y[train_idx])
+            X_train, X_test = step.transform(X_train), step.transform(X_test)
+        folds.append((X_train, y[train_idx], X_test, y[test_idx]))
+    return folds
+
+
+def search(estimator, param_grid, X, y, preprocess=None, n_iter=None, cv=5, scoring=None,
+           workers=None, random_state=0, leaderboard_path=None):
+    # Cross-validates every candidate and refits the best one on all of X.
+    # preprocess, an optional transformer, is fitted per fold and placed in
+    # front of the refitted model. scoring is an sklearn scorer name (higher
+    # is better); by default the estimator's own score() is used. Returns
+    # (best_model, leaderboard), the leaderboard being a DataFrame sorted best
+    # first, also written as CSV to leaderboard_path if given.
+    params_list = candidates(param_grid, n_iter, random_state)
+    X_array, y_array = np.asarray(X), np.asarray(y)
+
+    folder = tempfile.mkdtemp(prefix="model-search-")
+    try:
+        folds_path = os.path.join(folder, "folds.joblib")
+        joblib.dump(make_folds(X_array, y_array, cv, preprocess, is_classifier(estimator), random_state),
+                    folds_path, compress=0)
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 initializer=_load_folds, initargs=(folds_path,)) as pool:
+            futures = [[pool.submit(_fit_fold, estimator, params, fold, scoring) for fold in range(cv)]
+                       for params in params_list]
+            results = [[future.result() for future in per_fold] for per_fold in futures]
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    rows = []
+    for params, per_fold in zip(params_list, results):
+        scores = [score for score, _ in per_fold]
+        rows.append({
+            "mean_score": float(np.mean(scores)),
+            "std_score": float(np.std(scores)),
+            "fit_seconds": sum(seconds for _, seconds in per_fold),
+            **{f"param_{name}": value for name, value in params.items()},
+        })
+    if all(np.isnan(row["mean_score"]) for row in rows):
+        raise ValueError("every candidate failed to fit")
+    order = sorted(range(len(rows)), key=lambda i: (np.isnan(rows[i]["mean_score"]), -rows[i]["mean_score"]))
+    leaderboard = pd.DataFrame([rows[i] for i in order])
+    leaderboard.insert(0, "rank", range(1, len(order) + 1))
+    if leaderboard_path:
+        folder = os.path.dirname(leaderboard_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        leaderboard.to_csv(leaderboard_path, index=False)
+
+    best = clone(estimator).set_params(**params_list[order[0]])
+    if preprocess is not None:
+        best = Pipeline([("preprocess", clone(preprocess)), ("model", best)])
+    best.fit(X, y)
+    return best, leaderboard
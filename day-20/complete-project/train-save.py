@@ -1,16 +1,40 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import time
+
+import joblib
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.pipeline import Pipeline
-from sklearn.linear_model import LogisticRegression
-import pickle
-import os
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+from model_registry import save_model
+from model_search import search
+
+DATA_PATH = "heart.csv"
+MODEL_PATH = "artifacts/heart_pipeline.joblib"
+MANIFEST_PATH = "artifacts/heart_pipeline.manifest.json"
+LEADERBOARD_PATH = "artifacts/heart_search_leaderboard.csv"
 
-# Load dataset
-df = pd.read_csv("heart.csv")
+# Candidates tried by --search; the scaler is fitted once per CV fold
+SEARCH_GRID = {
+    "C": [0.001, 0.01, 0.1, 0.3, 1.0, 3.0, 10.0, 100.0],
+    "class_weight": [None, "balanced"],
+    "solver": ["lbfgs", "liblinear"],
+}
+
+# Bytes at the start of the CSV and just before the last trained offset that
+# are hashed to check the already-seen part was only appended to
+FINGERPRINT_BYTES = 4096
+
+CLASSES = [0, 1]
 
 # Rename columns to match code expectations
-df = df.rename(columns={
+COLUMNS = {
     "Age": "age",
     "Sex": "sex",
     "ChestPain": "cp",
@@ -25,37 +49,205 @@ df = df.rename(columns={
     "Ca": "ca",
     "Thal": "thal",
     "AHD": "target"
-})
+}
+
+
+def prepare(df):
+    df = df.rename(columns=COLUMNS)
+
+    # Encode categorical columns
+    df["cp"] = df["cp"].map({"typical": 0, "asymptomatic": 1, "nonanginal": 2, "nontypical": 3})
+    df["thal"] = df["thal"].map({"normal": 1, "fixed": 2, "reversable": 3})
+    df["target"] = df["target"].map({"No": 0, "Yes": 1})
+    df = df.dropna()
+
+    # Features & target
+    X = df.drop(["target", "index"], axis=1)
+    y = df["target"]
+    return X, y
+
+
+def fingerprint(path, end):
+    # The first and last FINGERPRINT_BYTES of the trained part: constant
+    # cost, and catches a replaced, truncated or re-sorted file (not every
+    # edit in the middle; run a full retrain after those)
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        digest.update(f.read(min(end, FINGERPRINT_BYTES)))
+        f.seek(max(0, end - FINGERPRINT_BYTES))
+        digest.update(f.read(min(end, FINGERPRINT_BYTES)))
+    return digest.hexdigest()
+
+
+def read_new_rows(path, offset):
+    # Only complete lines after `offset` are read; a row still being written
+    # is left for the next run. Returns the rows and the new offset.
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(max(offset, len(header)))
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    new_offset = max(offset, len(header)) + end
+    if end == 0:
+        return None, new_offset
+    return pd.read_csv(io.BytesIO(header + data[:end])), new_offset
+
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_PATH):
+        return None
+    with open(MANIFEST_PATH) as f:
+        return json.load(f)
+
+
+def publish(pipeline, manifest, mode, rows, rows_seen, offset, keep):
+    # Every run gets its own numbered artifact; the serving path is replaced
+    # by the newest one, which app.py picks up without a restart
+    version = (manifest or {}).get("version", 0) + 1
+    artifact = f"artifacts/heart_pipeline-v{version}.joblib"
+    save_model(pipeline, artifact)
+    save_model(pipeline, MODEL_PATH)
+
+    history = (manifest or {}).get("history", [])
+    history.append({"version": version, "mode": mode, "rows": rows, "trained_at": time.time()})
+    for old in history[:-keep]:
+        old_artifact = f"artifacts/heart_pipeline-v{old['version']}.joblib"
+        if os.path.exists(old_artifact):
+            os.remove(old_artifact)
+    history = history[-keep:]
+
+    manifest = {
+        "version": version,
+        "artifact": artifact,
+        "estimator": type(pipeline.steps[-1][1]).__name__,
+        "data": DATA_PATH,
+        "offset": offset,
+        "fingerprint": fingerprint(DATA_PATH, offset),
+        "rows_seen": rows_seen,
+        "history": history,
+    }
+    tmp = f"{MANIFEST_PATH}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, MANIFEST_PATH)
+    return manifest
+
+
+def train_full(manifest, keep):
+    df = pd.read_csv(DATA_PATH)
+    X, y = prepare(df)
+
+    # Train-test split
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    # Build pipeline
+    pipeline = Pipeline([
+        ("scaler", StandardScaler()),
+        ("clf", LogisticRegression(max_iter=1000))
+    ])
+
+    # Train model
+    pipeline.fit(X_train, y_train)
+
+    # Evaluate
+    print("Train Accuracy:", pipeline.score(X_train, y_train))
+    print("Test Accuracy:", pipeline.score(X_test, y_test))
+
+    return publish(pipeline, manifest, "full", len(X), len(X), os.path.getsize(DATA_PATH), keep)
+
+
+def train_search(manifest, workers, keep):
+    df = pd.read_csv(DATA_PATH)
+    X, y = prepare(df)
+
+    # Same held-out test set as a full run; the search only sees X_train
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    pipeline, leaderboard = search(LogisticRegression(max_iter=1000), SEARCH_GRID, X_train, y_train,
+                                   preprocess=StandardScaler(), scoring="accuracy", workers=workers,
+                                   random_state=42, leaderboard_path=LEADERBOARD_PATH)
+    print(leaderboard.head(5).to_string(index=False))
+    print("Leaderboard saved to", LEADERBOARD_PATH)
+    print("Train Accuracy:", pipeline.score(X_train, y_train))
+    print("Test Accuracy:", pipeline.score(X_test, y_test))
+
+    return publish(pipeline, manifest, "search", len(X), len(X), os.path.getsize(DATA_PATH), keep)
+
+
+def can_resume(manifest):
+    if manifest is None or manifest.get("estimator") != "SGDClassifier":
+        return False
+    if not os.path.exists(manifest["artifact"]):
+        return False
+    size = os.path.getsize(DATA_PATH)
+    return manifest["offset"] <= size and manifest["fingerprint"] == fingerprint(DATA_PATH, manifest["offset"])
+
 
-# Encode categorical columns
-df["cp"] = df["cp"].map({"typical": 0, "asymptomatic": 1, "nonanginal": 2, "nontypical": 3})
-df["thal"] = df["thal"].map({"normal": 1, "fixed": 2, "reversable": 3})
-df["target"] = df["target"].map({"No": 0, "Yes": 1})
-df = df.dropna()
+def train_incremental(manifest, epochs, keep):
+    # SGDClassifier supports partial_fit, so the saved pipeline is updated
+    # with only the rows appended since the last run. The scaler is fitted on
+    # the first run's rows and then frozen: moving its mean and scale would
+    # feed the already-trained weights differently scaled inputs. Run a full
+    # retrain if the feature distribution drifts far from those first rows.
+    resumed = can_resume(manifest)
+    if resumed:
+        # Plain joblib.load: the memory-mapped arrays load_model gives are read-only
+        pipeline = joblib.load(manifest["artifact"])
+        offset, rows_seen = manifest["offset"], manifest["rows_seen"]
+    else:
+        if manifest is not None:
+            print("No resumable SGD model for this data; starting from the first row")
+        pipeline = Pipeline([
+            ("scaler", StandardScaler()),
+            ("clf", SGDClassifier(loss="log_loss", alpha=1e-3, random_state=42))
+        ])
+        offset, rows_seen = 0, 0
 
-# Features & target
-X = df.drop(["target", "index"], axis=1)
-y = df["target"]
+    df, new_offset = read_new_rows(DATA_PATH, offset)
+    X, y = prepare(df) if df is not None else (None, [])
+    if len(y) == 0:
+        print("No new rows since the last run; model unchanged")
+        return manifest
 
-# Train-test split
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    scaler, clf = pipeline.named_steps["scaler"], pipeline.named_steps["clf"]
+    if resumed:
+        # Progressive validation: score the new rows before learning from them
+        print("Accuracy on new rows before update:", pipeline.score(X, y))
 
-# Build pipeline
-pipeline = Pipeline([
-    ("scaler", StandardScaler()),
-    ("clf", LogisticRegression(max_iter=1000))
-])
+    if not resumed:
+        scaler.fit(X)
+    X_scaled = scaler.transform(X)
+    for _ in range(epochs):
+        clf.partial_fit(X_scaled, y, classes=CLASSES)
+    print("Accuracy on new rows after update:", pipeline.score(X, y))
 
-# Train model
-pipeline.fit(X_train, y_train)
+    return publish(pipeline, manifest, "incremental", len(X), rows_seen + len(X), new_offset, keep)
 
-# Evaluate
-print("Train Accuracy:", pipeline.score(X_train, y_train))
-print("Test Accuracy:", pipeline.score(X_test, y_test))
 
-# Save model
-os.makedirs("artifacts", exist_ok=True)
-with open("artifacts/heart_pipeline.pkl", "wb") as f:
-    pickle.dump(pipeline, f)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the heart disease model")
+    parser.add_argument("--incremental", action="store_true",
+                        help="update the saved SGD model with rows appended since the last run")
+    parser.add_argument("--search", action="store_true",
+                        help="cross-validate SEARCH_GRID on all cores and save the best model")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes for --search (default: one per CPU)")
+    parser.add_argument("--epochs", type=int, default=5,
+                        help="partial_fit passes over the new rows (incremental mode)")
+    parser.add_argument("--keep", type=int, default=5,
+                        help="number of versioned artifacts to keep")
+    args = parser.parse_args()
+    if args.keep < 1:
+        parser.error("--keep must be at least 1")
 
-print("✅ Model saved to artifacts/heart_pipeline.pkl")
+    start = time.perf_counter()
+    previous = load_manifest()
+    if args.incremental:
+        result = train_incremental(previous, args.epochs, args.keep)
+    elif args.search:
+        result = train_search(previous, args.workers, args.keep)
+    else:
+        result = train_full(previous, args.keep)
+    if result is not None and result is not previous:
+        print(f"✅ Model v{result['version']} saved to {result['artifact']} and {MODEL_PATH} "
+              f"({time.perf_counter() - start:.2f}s)")
@@ -0,0 +1,148 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from housingapp import Housing
+
+# Column order used for training, for models saved without feature names
+FEATURES = ['Avg. Area Income', 'Avg. Area House Age', 'Avg. Area Number of Rooms',
+            'Avg. Area Number of Bedrooms', 'Area Population']
+
+# Model used by score_chunk in worker processes
+_model = None
+
+
+def load(model_dir):
+    h = Housing(None)
+    h.loadmodel(model_dir)
+    return h.getmodel()
+
+
+def _init_worker(model_dir):
+    global _model
+    _model = load(model_dir)
+
+
+def schema(model):
+    names = getattr(model, 'feature_names_in_', None)
+    return list(names) if names is not None else FEATURES
+
+
+def score_chunk(X, model=None):
+    # One predict() call for the whole chunk; rows with a missing value get NaN
+    model = model if model is not None else _model
+    predictions = np.full(len(X), np.nan)
+    complete = X.notna().all(axis=1).to_numpy()
+    if complete.any():
+        predictions[complete] = model.predict(X[complete])
+    return predictions
+
+
+class Output:
+    # Appends each scored chunk to a Parquet (needs pyarrow) or CSV file, so
+    # memory stays bounded by the chunk size
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self.writer = None
+        self.header = True
+
+    def write(self, frame):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, table.schema)
+            self.writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='w' if self.header else 'a', header=self.header, index=False)
+            self.header = False
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def score(args):
+    model = load(args.model_dir)
+    features = schema(model)
+
+    header = pd.read_csv(args.input, nrows=0).columns
+    missing = [column for column in features + args.keep if column not in header]
+    if missing:
+        print(f"{args.input} is missing columns: {', '.join(missing)}", file=sys.stderr)
+        return 2
+
+    chunks = pd.read_csv(args.input, usecols=features + args.keep, chunksize=args.chunksize,
+                         dtype={column: 'float64' for column in features})
+    output = Output(args.output)
+    rows = incomplete = 0
+    start = time.perf_counter()
+
+    def emit(chunk, predictions):
+        nonlocal rows, incomplete
+        result = chunk[args.keep].copy()
+        result['prediction'] = predictions
+        output.write(result)
+        rows += len(chunk)
+        incomplete += int(np.isnan(predictions).sum())
+
+    try:
+        if args.workers > 1:
+            # At most two chunks per worker in flight, written back in input order
+            with ProcessPoolExecutor(args.workers, initializer=_init_worker,
+                                     initargs=(args.model_dir,)) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append((chunk, pool.submit(score_chunk, chunk[features])))
+                    if len(pending) >= 2 * args.workers:
+                        done, future = pending.popleft()
+                        emit(done, future.result())
+                while pending:
+                    done, future = pending.popleft()
+                    emit(done, future.result())
+        else:
+            for chunk in chunks:
+                emit(chunk, score_chunk(chunk[features], model))
+    except ValueError as e:
+        # e.g. text in a numeric column
+        print(f"Could not read {args.input}: {e}", file=sys.stderr)
+        return 2
+    finally:
+        output.close()
+
+    seconds = time.perf_counter() - start
+    print(f"Scored {rows} rows in {seconds:.2f}s ({rows / seconds if seconds else 0:,.0f} rows/s) -> {args.output}")
+    if incomplete:
+        print(f"{incomplete} rows had missing values and were given no prediction")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='housing', description='Housing price model tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    score_parser = commands.add_parser('score', help='predict prices for every row of a CSV file')
+    score_parser.add_argument('--in', dest='input', required=True, help='CSV file with the training feature columns')
+    score_parser.add_argument('--out', dest='output', required=True, help='.parquet or .csv file to write')
+    score_parser.add_argument('--model-dir', default=os.path.dirname(os.path.abspath(__file__)),
+                              help='folder holding housing_model.joblib or housing_model.pkl')
+    score_parser.add_argument('--chunksize', type=int, default=100000, help='rows read and predicted at a time')
+    score_parser.add_argument('--workers', type=int, default=1, help='processes used for prediction')
+    score_parser.add_argument('--keep', action='append', default=[],
+                              help='input column copied to the output, e.g. --keep Address (repeatable)')
+    score_parser.set_defaults(handler=score)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
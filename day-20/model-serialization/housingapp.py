@@ -1,9 +1,23 @@
+import argparse
+import sys
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-import pickle
+from sklearn.linear_model import LinearRegression, Ridge
 import os.path
 
+# model_registry.py and model_search.py live with the heart model in ../complete-project
+try:
+    from model_registry import first_existing, load_model, save_model
+    from model_search import search
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "complete-project"))
+    from model_registry import first_existing, load_model, save_model
+    from model_search import search
+
+# Candidates tried by Housing.tune()
+RIDGE_GRID = {'alpha': [0.001, 0.01, 0.1, 1, 10, 100, 1000]}
+
 class Housing(object):
 
     def __init__(self, datasource):
@@ -14,6 +28,7 @@ class Housing(object):
         self.y_train = []
         self.y_test = []
         self.model = []
+        self.leaderboard = None
         
     def acquire(self):
         try:
@@ -44,23 +59,91 @@ class Housing(object):
         except:
             return(False, '', 'Model creation failed')
         
+    def train_streaming(self, chunksize=100000, target='Price'):
+        # Same least-squares fit as train(), but over the whole CSV read in
+        # chunks: only the running sums and cross-products (XᵀX, Xᵀy) are
+        # kept, so memory does not grow with the file, and the normal
+        # equations are solved once at the end. Values are taken relative to
+        # the first chunk's means, which keeps XᵀX well conditioned. Rows with
+        # a missing value are left out and counted in the message.
+        try:
+            columns = pd.read_csv(self.datasource, nrows=0).columns
+            predictors = [column for column in columns if column not in (target, 'Address')]
+            dtypes = {column: 'float64' for column in predictors + [target]}
+            k = len(predictors)
+            n, skipped, sum_x, sum_y = 0, 0, np.zeros(k), 0.0
+            xtx, xty = np.zeros((k, k)), np.zeros(k)
+            shift_x = shift_y = None
+            for chunk in pd.read_csv(self.datasource, usecols=predictors + [target], dtype=dtypes,
+                                     chunksize=chunksize):
+                complete = chunk.notna().all(axis=1).to_numpy()
+                skipped += int((~complete).sum())
+                if not complete.any():
+                    continue
+                X = chunk[predictors].to_numpy()[complete]
+                y = chunk[target].to_numpy()[complete]
+                if shift_x is None:
+                    shift_x, shift_y = X.mean(axis=0), y.mean()
+                X = X - shift_x
+                y = y - shift_y
+                n += len(y)
+                sum_x += X.sum(axis=0)
+                sum_y += y.sum()
+                xtx += X.T @ X
+                xty += X.T @ y
+            if n == 0:
+                return(False, '', 'No complete rows in {} ({} skipped)'.format(self.datasource, skipped))
+
+            mean_x, mean_y = sum_x / n, sum_y / n
+            sxx = xtx - n * np.outer(mean_x, mean_x)
+            sxy = xty - n * mean_x * mean_y
+            try:
+                coef = np.linalg.solve(sxx, sxy)
+            except np.linalg.LinAlgError:
+                coef = np.linalg.lstsq(sxx, sxy, rcond=None)[0]
+
+            self.model = LinearRegression()
+            self.model.coef_ = coef
+            self.model.intercept_ = float(mean_y + shift_y - (mean_x + shift_x) @ coef)
+            self.model.n_features_in_ = k
+            self.model.feature_names_in_ = np.asarray(predictors, dtype=object)
+            message = 'Model created from {} rows'.format(n)
+            if skipped:
+                message += ' ({} rows with missing values skipped)'.format(skipped)
+            return(True, self.model, message)
+        except Exception as ErrorMessage:
+            return(False, '', ErrorMessage)
+
+    def tune(self, param_grid=RIDGE_GRID, n_iter=None, workers=None, leaderboard_path='housing_leaderboard.csv'):
+        # Cross-validated search over a Ridge model on all cores, keeping the best
+        try:
+            self.model, self.leaderboard = search(Ridge(), param_grid, self.X_train, self.y_train,
+                                                  n_iter=n_iter, workers=workers,
+                                                  leaderboard_path=leaderboard_path)
+            return(True, self.model, 'Best of {} candidates, leaderboard in {}'.format(len(self.leaderboard), leaderboard_path))
+        except Exception as ErrorMessage:
+            return(False, '', ErrorMessage)
+
     def getparams(self):
         return {'intercept':self.model.intercept_, 'slope':self.model.coef_}
         
     def savemodel(self, path='.'):
-        with open(os.path.join(path, "housing_model.pkl"), "wb") as file:
-            pickle.dump(self.model, file)
+        save_model(self.model, os.path.join(path, "housing_model.joblib"))
 
     def loadmodel(self, path):
-        with open(os.path.join(path, "housing_model.pkl"), "rb") as file:
-            self.model = pickle.load(file)
+        # Prefers the memory-mappable joblib artifact, falls back to the old pickle
+        self.model = load_model(first_existing(os.path.join(path, "housing_model.joblib"),
+                                               os.path.join(path, "housing_model.pkl")))
 
     def getmodel(self):
         return self.model
 
     def getpredictions(self, values=[100000, 15, 5, 3, 50000]):
-        inputs = []
-        inputs.append(values)
+        # One feature vector or a 2-D batch of them, predicted in one call
+        inputs = np.atleast_2d(np.asarray(values, dtype=float))
+        names = getattr(self.model, 'feature_names_in_', None)
+        if names is not None:
+            inputs = pd.DataFrame(inputs, columns=names)
         return self.model.predict(inputs)
     
     def pipeline(self):
@@ -74,11 +157,20 @@ class Housing(object):
 
 if __name__ == '__main__':
 
+    parser = argparse.ArgumentParser(description='Train the housing price model')
+    parser.add_argument('--stream', action='store_true',
+                        help='fit on the whole CSV in chunks, in bounded memory')
+    parser.add_argument('--chunksize', type=int, default=100000)
+    args = parser.parse_args()
+
     file = r'USA_Housing.csv'
     h = Housing(file)
-    print('Data Aquisition:   >> ', h.acquire())
-    print('Data Preparation:  >> ', h.prepare())
-    print('Splitting:         >> ', h.split())
-    print('Training:          >> ', h.train())
+    if args.stream:
+        print('Streaming Training: >> ', h.train_streaming(args.chunksize))
+    else:
+        print('Data Aquisition:   >> ', h.acquire())
+        print('Data Preparation:  >> ', h.prepare())
+        print('Splitting:         >> ', h.split())
+        print('Training:          >> ', h.train())
     print('Parameters:        >> ', h.getparams())
     print('Save Model:        >> ', h.savemodel())
\ No newline at end of file
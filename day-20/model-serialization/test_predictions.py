@@ -1,7 +1,8 @@
-import pickle
+import os
 
-model = []
-with open(r'C:\mindful-ai\sapient-ds\2025\work\day-07\model-serialization\housing_model.pkl', 'rb') as file:
-    model = pickle.load(file)
+from housingapp import Housing
 
-print(model.predict([[100000, 15, 5, 3, 50000]]))
\ No newline at end of file
+h = Housing(None)
+h.loadmodel(os.path.dirname(os.path.abspath(__file__)))
+
+print(h.getpredictions([[100000, 15, 5, 3, 50000]]))
\ No newline at end of file
@@ -1,5 +1,9 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from bisect import bisect_left, insort
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from pydantic import BaseModel, ValidationError
+import json
+import math
+import re
 
 app = FastAPI()
 
@@ -8,8 +12,160 @@ class Book(BaseModel):
     title: str
     author: str
 
+# Book with its id, as used by the bulk endpoints
+class BookWithId(Book):
+    id: int
+
+class BookId(BaseModel):
+    id: int
+
+# In-memory inverted index for /books/search: token -> ids of the books whose
+# title or author contain it. Tokens are also kept sorted so every token
+# starting with a prefix can be found with bisect.
+class SearchIndex:
+    def __init__(self):
+        self.postings = {}
+        self.tokens = []
+
+    @staticmethod
+    def tokenize(text: str):
+        return re.findall(r"\w+", text.lower())
+
+    def add(self, book_id: int, book: Book):
+        for token in set(self.tokenize(book.title) + self.tokenize(book.author)):
+            ids = self.postings.get(token)
+            if ids is None:
+                ids = self.postings[token] = set()
+                insort(self.tokens, token)
+            ids.add(book_id)
+
+    def remove(self, book_id: int, book: Book):
+        for token in set(self.tokenize(book.title) + self.tokenize(book.author)):
+            ids = self.postings.get(token)
+            if ids is None:
+                continue
+            ids.discard(book_id)
+            if not ids:
+                del self.postings[token]
+                del self.tokens[bisect_left(self.tokens, token)]
+
+    def clear(self):
+        self.postings.clear()
+        self.tokens.clear()
+
+    def search(self, query: str, limit: int):
+        # Every query term must match (as a prefix); rarer terms score higher.
+        total = len(books) or 1
+        scores = None
+        for term in self.tokenize(query):
+            term_scores = {}
+            start = bisect_left(self.tokens, term)
+            for token in self.tokens[start:]:
+                if not token.startswith(term):
+                    break
+                ids = self.postings[token]
+                weight = math.log(1 + total / len(ids))
+                for book_id in ids:
+                    term_scores[book_id] = max(term_scores.get(book_id, 0.0), weight)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {book_id: score + term_scores[book_id] for book_id, score in scores.items() if book_id in term_scores}
+            if not scores:
+                return []
+        if scores is None:
+            return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [{"id": book_id, "score": round(score, 4), **books[book_id].model_dump()} for book_id, score in ranked]
+
 # In-memory storage
 books = {}
+search_index = SearchIndex()
+
+# All writes go through these two so the search index stays in sync
+def put_book(book_id: int, book: Book):
+    if book_id in books:
+        search_index.remove(book_id, books[book_id])
+    books[book_id] = book
+    search_index.add(book_id, book)
+
+def remove_book(book_id: int):
+    book = books.pop(book_id, None)
+    if book is not None:
+        search_index.remove(book_id, book)
+    return book
+
+# Bulk bodies are a JSON array, or one JSON object per line when sent
+# with Content-Type: application/x-ndjson
+async def read_bulk_items(request: Request) -> list:
+    try:
+        if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+            items, pending = [], b""
+            async for chunk in request.stream():
+                pending += chunk
+                *lines, pending = pending.split(b"\n")
+                items.extend(json.loads(line) for line in lines if line.strip())
+            if pending.strip():
+                items.append(json.loads(pending))
+            return items
+        items = json.loads(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid JSON: {e}")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=422, detail="Expected a JSON array")
+    return items
+
+# Validate every item first; each one gets its own result entry
+def validate_items(items: list, model):
+    valid, results = [], [None] * len(items)
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, model.model_validate(item)))
+        except ValidationError as e:
+            results[index] = {"index": index, "status": 422, "detail": e.errors(include_url=False, include_context=False)}
+    return valid, results
+
+def bulk_response(results: list):
+    succeeded = sum(1 for r in results if r["status"] < 400)
+    return {"succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+
+# Bulk routes are declared before /books/{book_id} so "bulk" is not read as an id
+
+# Create many books in one request
+@app.post("/books/bulk")
+def create_books_bulk(items: list = Depends(read_bulk_items)):
+    valid, results = validate_items(items, BookWithId)
+    for index, item in valid:
+        if item.id in books:
+            results[index] = {"index": index, "status": 400, "id": item.id, "detail": "Book already exists"}
+        else:
+            put_book(item.id, Book(title=item.title, author=item.author))
+            results[index] = {"index": index, "status": 201, "id": item.id}
+    return bulk_response(results)
+
+# Update many books in one request
+@app.put("/books/bulk")
+def update_books_bulk(items: list = Depends(read_bulk_items)):
+    valid, results = validate_items(items, BookWithId)
+    for index, item in valid:
+        if item.id not in books:
+            results[index] = {"index": index, "status": 404, "id": item.id, "detail": "Book not found"}
+        else:
+            put_book(item.id, Book(title=item.title, author=item.author))
+            results[index] = {"index": index, "status": 200, "id": item.id}
+    return bulk_response(results)
+
+# Delete many books in one request; items are ids or {"id": ...} objects
+@app.delete("/books/bulk")
+def delete_books_bulk(items: list = Depends(read_bulk_items)):
+    items = [{"id": item} if not isinstance(item, dict) else item for item in items]
+    valid, results = validate_items(items, BookId)
+    for index, item in valid:
+        if remove_book(item.id) is None:
+            results[index] = {"index": index, "status": 404, "id": item.id, "detail": "Book not found"}
+        else:
+            results[index] = {"index": index, "status": 200, "id": item.id}
+    return bulk_response(results)
 
 # Get a list of all books
 @app.get("/books")
@@ -21,9 +177,14 @@ def get_books():
 def create_book(book_id: int, book: Book):
     if book_id in books:
         raise HTTPException(status_code=400, detail="Book already exists")
-    books[book_id] = book
+    put_book(book_id, book)
     return {"message": "Book created", "book": book}
 
+# Search titles and authors; each word matches as a prefix
+@app.get("/books/search")
+def search_books(q: str, limit: int = Query(20, ge=1, le=100)):
+    return search_index.search(q, limit)
+
 # Get a specific book by id
 @app.get("/books/{book_id}")
 def get_book(book_id: int):
@@ -36,7 +197,7 @@ def get_book(book_id: int):
 def update_book(book_id: int, book: Book):
     if book_id not in books:
         raise HTTPException(status_code=404, detail="Book not found")
-    books[book_id] = book
+    put_book(book_id, book)
     return {"message": "Book updated", "book": book}
     
 # Delete a book using delete request
@@ -44,7 +205,7 @@ def update_book(book_id: int, book: Book):
 def delete_book(book_id: int):
     if book_id not in books:
         raise HTTPException(status_code=404, detail="Book not found")
-    del books[book_id]
+    remove_book(book_id)
     return {"message": "Book deleted"}
 
 
@@ -1,21 +1,57 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from contextlib import asynccontextmanager, contextmanager
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ValidationError
+import hashlib
+import json
+import queue
 import sqlite3
 from typing import List, Optional
 
-app = FastAPI(title="Book CRUD API with SQLite")
+DB_PATH = "books.db"
+POOL_SIZE = 8
+BOOK_FIELDS = ("id", "title", "author")
+MAX_PAGE_SIZE = 1000
+SQL_VARIABLE_CHUNK = 900  # stay under SQLite's bound-parameter limit
 
 # ----------------------------
 # Database setup
 # ----------------------------
-def get_db_connection():
-    conn = sqlite3.connect("books.db")
-    conn.row_factory = sqlite3.Row  # rows behave like dicts
-    return conn
+# Fixed set of SQLite connections, opened once at startup and handed out to
+# one request at a time instead of connecting per request.
+class ConnectionPool:
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self._idle = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self._idle.put(self._connect())
+
+    def _connect(self):
+        # Requests run on FastAPI's thread pool, so a connection may be used
+        # from different threads, though never by two at once.
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # rows behave like dicts
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA mmap_size=268435456")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
 
 # Create table if not exists
-def init_db():
-    conn = get_db_connection()
+def init_db(conn: sqlite3.Connection):
     cursor = conn.cursor()
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS books (
@@ -24,10 +60,68 @@ def init_db():
             author TEXT NOT NULL
         )
     """)
+    # A counter bumped by every write, so GET /books/ can build an ETag
+    # without counting the table, and in-place edits change it too.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS books_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO books_version (id, version) VALUES (1, 0)")
+    # Full-text index over title and author for /books/search. It stores no
+    # copy of the text (content='books') and is kept in sync by triggers.
+    fts_exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'books_fts'").fetchone()
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS books_fts
+        USING fts5(title, author, content='books', content_rowid='id')
+    """)
+    if not fts_exists:
+        cursor.execute("INSERT INTO books_fts (books_fts) VALUES ('rebuild')")
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books
+        BEGIN
+            INSERT INTO books_fts (rowid, title, author) VALUES (new.id, new.title, new.author);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books
+        BEGIN
+            INSERT INTO books_fts (books_fts, rowid, title, author) VALUES ('delete', old.id, old.title, old.author);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS books_fts_update AFTER UPDATE ON books
+        BEGIN
+            INSERT INTO books_fts (books_fts, rowid, title, author) VALUES ('delete', old.id, old.title, old.author);
+            INSERT INTO books_fts (rowid, title, author) VALUES (new.id, new.title, new.author);
+        END
+    """)
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS books_version_{event.lower()}
+            AFTER {event} ON books
+            BEGIN
+                UPDATE books_version SET version = version + 1 WHERE id = 1;
+            END
+        """)
     conn.commit()
-    conn.close()
 
-init_db()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    pool = ConnectionPool(DB_PATH, POOL_SIZE)
+    with pool.connection() as conn:
+        init_db(conn)
+    app.state.pool = pool
+    yield
+    pool.close()
+
+app = FastAPI(title="Book CRUD API with SQLite", lifespan=lifespan)
+
+def get_db(request: Request):
+    with request.app.state.pool.connection() as conn:
+        yield conn
 
 # ----------------------------
 # Pydantic models
@@ -37,63 +131,210 @@ class Book(BaseModel):
     title: str
     author: str
 
+class BookId(BaseModel):
+    id: int
+
+# Bulk request bodies are either a JSON array or, with
+# Content-Type: application/x-ndjson, one JSON object per line.
+async def read_bulk_items(request: Request) -> list:
+    try:
+        if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+            items, pending = [], b""
+            async for chunk in request.stream():
+                pending += chunk
+                *lines, pending = pending.split(b"\n")
+                items.extend(json.loads(line) for line in lines if line.strip())
+            if pending.strip():
+                items.append(json.loads(pending))
+            return items
+        items = json.loads(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid JSON: {e}")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=422, detail="Expected a JSON array")
+    return items
+
+def validate_items(items: list, model):
+    valid, results = [], [None] * len(items)
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, model.model_validate(item)))
+        except ValidationError as e:
+            results[index] = {"index": index, "status": 422, "detail": e.errors(include_url=False, include_context=False)}
+    return valid, results
+
+def existing_ids(conn: sqlite3.Connection, ids: list) -> set:
+    found = set()
+    for start in range(0, len(ids), SQL_VARIABLE_CHUNK):
+        chunk = ids[start:start + SQL_VARIABLE_CHUNK]
+        placeholders = ", ".join("?" * len(chunk))
+        found.update(row[0] for row in conn.execute(f"SELECT id FROM books WHERE id IN ({placeholders})", chunk))
+    return found
+
+def bulk_response(results: list):
+    succeeded = sum(1 for r in results if r["status"] < 400)
+    return {"succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+
+# Each word of q becomes a quoted prefix term, so user input cannot inject
+# FTS5 query syntax; all terms must match.
+def fts_query(q: str) -> str:
+    words = q.split()
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in words)
+
+# ----------------------------
+# Search Endpoint
+# ----------------------------
+
+@app.get("/books/search")
+def search_books(q: str, limit: int = Query(20, ge=1, le=100), conn: sqlite3.Connection = Depends(get_db)):
+    match = fts_query(q)
+    if not match:
+        return []
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT books.id, books.title, books.author, bm25(books_fts) AS score
+        FROM books_fts JOIN books ON books.id = books_fts.rowid
+        WHERE books_fts MATCH ?
+        ORDER BY score
+        LIMIT ?
+    """, (match, limit))
+    return [dict(row) for row in cursor.fetchall()]
+
+# ----------------------------
+# Bulk Endpoints
+# ----------------------------
+# Declared before /books/{book_id} so "bulk" is not taken for an id. Each
+# request is validated up front and written in one transaction.
+
+@app.post("/books/bulk")
+def create_books_bulk(items: list = Depends(read_bulk_items), conn: sqlite3.Connection = Depends(get_db)):
+    valid, results = validate_items(items, Book)
+    conn.execute("BEGIN IMMEDIATE")
+    # Ids are assigned here, under the write lock, because executemany cannot
+    # report a lastrowid per row.
+    next_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM books").fetchone()[0]
+    seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'books'").fetchone()
+    next_id = max(next_id, seq[0] if seq else 0)
+    rows = []
+    for index, book in valid:
+        next_id += 1
+        rows.append((next_id, book.title, book.author))
+        results[index] = {"index": index, "status": 201, "id": next_id}
+    conn.executemany("INSERT INTO books (id, title, author) VALUES (?, ?, ?)", rows)
+    conn.commit()
+    return bulk_response(results)
+
+@app.put("/books/bulk")
+def update_books_bulk(items: list = Depends(read_bulk_items), conn: sqlite3.Connection = Depends(get_db)):
+    valid, results = validate_items(items, Book)
+    conn.execute("BEGIN IMMEDIATE")
+    found = existing_ids(conn, [book.id for _, book in valid if book.id is not None])
+    rows = []
+    for index, book in valid:
+        if book.id is None:
+            results[index] = {"index": index, "status": 422, "detail": "id is required"}
+        elif book.id not in found:
+            results[index] = {"index": index, "status": 404, "id": book.id, "detail": "Book not found"}
+        else:
+            rows.append((book.title, book.author, book.id))
+            results[index] = {"index": index, "status": 200, "id": book.id}
+    conn.executemany("UPDATE books SET title = ?, author = ? WHERE id = ?", rows)
+    conn.commit()
+    return bulk_response(results)
+
+@app.delete("/books/bulk")
+def delete_books_bulk(items: list = Depends(read_bulk_items), conn: sqlite3.Connection = Depends(get_db)):
+    # Items may be bare ids or objects with an "id" key.
+    items = [{"id": item} if not isinstance(item, dict) else item for item in items]
+    valid, results = validate_items(items, BookId)
+    conn.execute("BEGIN IMMEDIATE")
+    found = existing_ids(conn, [item.id for _, item in valid])
+    rows = []
+    for index, item in valid:
+        if item.id in found:
+            found.discard(item.id)
+            rows.append((item.id,))
+            results[index] = {"index": index, "status": 200, "id": item.id}
+        else:
+            results[index] = {"index": index, "status": 404, "id": item.id, "detail": "Book not found"}
+    conn.executemany("DELETE FROM books WHERE id = ?", rows)
+    conn.commit()
+    return bulk_response(results)
+
 # ----------------------------
 # CRUD Endpoints
 # ----------------------------
 
 @app.post("/books/", response_model=Book)
-def create_book(book: Book):
-    conn = get_db_connection()
+def create_book(book: Book, conn: sqlite3.Connection = Depends(get_db)):
     cursor = conn.cursor()
     cursor.execute("INSERT INTO books (title, author) VALUES (?, ?)",
                    (book.title, book.author))
     conn.commit()
     book.id = cursor.lastrowid
-    conn.close()
     return book
 
+# Keyset pagination: pass the last id of one page as after_id to get the next
+# (also returned in the X-Next-After-Id header). fields= picks columns; id is
+# always included because it is the cursor.
 @app.get("/books/", response_model=List[Book])
-def get_books():
-    conn = get_db_connection()
+def get_books(
+    request: Request,
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    conn: sqlite3.Connection = Depends(get_db),
+):
+    columns = ["id"]
+    if fields:
+        for name in (f.strip() for f in fields.split(",")):
+            if name not in BOOK_FIELDS:
+                raise HTTPException(status_code=400, detail=f"Unknown field '{name}'")
+            if name not in columns:
+                columns.append(name)
+    else:
+        columns = list(BOOK_FIELDS)
+
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM books")
-    rows = cursor.fetchall()
-    conn.close()
-    return [Book(**dict(row)) for row in rows]
+    version = cursor.execute("SELECT version FROM books_version WHERE id = 1").fetchone()[0]
+    page_key = f"{version}:{after_id}:{limit}:{','.join(columns)}"
+    etag = '"' + hashlib.sha1(page_key.encode()).hexdigest() + '"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    cursor.execute(f"SELECT {', '.join(columns)} FROM books WHERE id > ? ORDER BY id LIMIT ?",
+                   (after_id, limit))
+    rows = [dict(row) for row in cursor.fetchall()]
+    headers = {"ETag": etag}
+    if len(rows) == limit:
+        headers["X-Next-After-Id"] = str(rows[-1]["id"])
+    return JSONResponse(rows, headers=headers)
 
 @app.get("/books/{book_id}", response_model=Book)
-def get_book(book_id: int):
-    conn = get_db_connection()
+def get_book(book_id: int, conn: sqlite3.Connection = Depends(get_db)):
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM books WHERE id = ?", (book_id,))
     row = cursor.fetchone()
-    conn.close()
     if row is None:
         raise HTTPException(status_code=404, detail="Book not found")
     return Book(**dict(row))
 
 @app.put("/books/{book_id}", response_model=Book)
-def update_book(book_id: int, book: Book):
-    conn = get_db_connection()
+def update_book(book_id: int, book: Book, conn: sqlite3.Connection = Depends(get_db)):
     cursor = conn.cursor()
     cursor.execute("UPDATE books SET title = ?, author = ? WHERE id = ?",
                    (book.title, book.author, book_id))
     conn.commit()
     if cursor.rowcount == 0:
-        conn.close()
         raise HTTPException(status_code=404, detail="Book not found")
-    conn.close()
     book.id = book_id
     return book
 
 @app.delete("/books/{book_id}")
-def delete_book(book_id: int):
-    conn = get_db_connection()
+def delete_book(book_id: int, conn: sqlite3.Connection = Depends(get_db)):
     cursor = conn.cursor()
     cursor.execute("DELETE FROM books WHERE id = ?", (book_id,))
     conn.commit()
     if cursor.rowcount == 0:
-        conn.close()
         raise HTTPException(status_code=404, detail="Book not found")
-    conn.close()
     return {"message": f"Book {book_id} deleted successfully"}
@@ -19,13 +19,15 @@ class TestBooksAPI(unittest.TestCase):
     def setUp(self):
         """Clear books before each test"""
         # Access the app's books dictionary and clear it
-        from books import books
+        from books import books, search_index
         books.clear()
+        search_index.clear()
     
     def tearDown(self):
         """Clean up after each test"""
-        from books import books
+        from books import books, search_index
         books.clear()
+        search_index.clear()
     
     # ==================== GET ALL BOOKS ====================
     def test_get_all_books_empty(self):
@@ -293,6 +295,102 @@ class TestBooksAPI(unittest.TestCase):
         self.assertNotIn("2", books_list)
         self.assertIn("3", books_list)
 
+    
+    # ==================== BULK OPERATIONS ====================
+    def test_bulk_create_books(self):
+        """Test creating several books in one request"""
+        books_data = [
+            {"id": 1, "title": "1984", "author": "George Orwell"},
+            {"id": 2, "title": "Emma", "author": "Jane Austen"}
+        ]
+        response = self.client.post("/books/bulk", json=books_data)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["succeeded"], 2)
+        self.assertEqual(self.client.get("/books/2").json()["title"], "Emma")
+    
+    def test_bulk_create_ndjson(self):
+        """Test creating books from a newline-delimited JSON body"""
+        body = '{"id": 1, "title": "1984", "author": "George Orwell"}\n{"id": 2, "title": "Emma", "author": "Jane Austen"}\n'
+        response = self.client.post(
+            "/books/bulk",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"}
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.client.get("/books").json()), 2)
+    
+    def test_bulk_create_reports_each_item(self):
+        """Test that invalid and duplicate items fail without blocking the rest"""
+        self.client.post("/books/1", json={"title": "1984", "author": "George Orwell"})
+        books_data = [
+            {"id": 1, "title": "Duplicate", "author": "Someone"},
+            {"id": 2, "title": "Missing author"},
+            {"id": 3, "title": "Emma", "author": "Jane Austen"}
+        ]
+        response = self.client.post("/books/bulk", json=books_data)
+        
+        statuses = [result["status"] for result in response.json()["results"]]
+        self.assertEqual(statuses, [400, 422, 201])
+        self.assertEqual(response.json()["failed"], 2)
+    
+    def test_bulk_update_and_delete(self):
+        """Test bulk update and bulk delete"""
+        self.client.post("/books/bulk", json=[
+            {"id": 1, "title": "1984", "author": "George Orwell"},
+            {"id": 2, "title": "Emma", "author": "Jane Austen"}
+        ])
+        
+        response = self.client.put("/books/bulk", json=[
+            {"id": 1, "title": "Nineteen Eighty-Four", "author": "George Orwell"},
+            {"id": 9, "title": "Unknown", "author": "Nobody"}
+        ])
+        statuses = [result["status"] for result in response.json()["results"]]
+        self.assertEqual(statuses, [200, 404])
+        self.assertEqual(self.client.get("/books/1").json()["title"], "Nineteen Eighty-Four")
+        
+        response = self.client.request("DELETE", "/books/bulk", json=[1, {"id": 2}, 3])
+        statuses = [result["status"] for result in response.json()["results"]]
+        self.assertEqual(statuses, [200, 200, 404])
+        self.assertEqual(self.client.get("/books").json(), {})
+    
+    def test_bulk_invalid_body(self):
+        """Test that a bulk body that is not a JSON array is rejected"""
+        response = self.client.post("/books/bulk", json={"title": "1984"})
+        self.assertEqual(response.status_code, 422)
+
+    
+    # ==================== SEARCH ====================
+    def test_search_by_title_prefix(self):
+        """Test searching with a word prefix"""
+        self.client.post("/books/1", json={"title": "Pride and Prejudice", "author": "Jane Austen"})
+        self.client.post("/books/2", json={"title": "Emma", "author": "Jane Austen"})
+        self.client.post("/books/3", json={"title": "1984", "author": "George Orwell"})
+        
+        response = self.client.get("/books/search", params={"q": "prej"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([book["id"] for book in response.json()], [1])
+    
+    def test_search_requires_all_terms(self):
+        """Test that every query word must match"""
+        self.client.post("/books/1", json={"title": "Pride and Prejudice", "author": "Jane Austen"})
+        self.client.post("/books/2", json={"title": "Emma", "author": "Jane Austen"})
+        
+        response = self.client.get("/books/search", params={"q": "austen emma"})
+        self.assertEqual([book["id"] for book in response.json()], [2])
+    
+    def test_search_follows_updates_and_deletes(self):
+        """Test that the search index tracks updates and deletes"""
+        self.client.post("/books/1", json={"title": "1984", "author": "George Orwell"})
+        self.client.put("/books/1", json={"title": "Animal Farm", "author": "George Orwell"})
+        
+        self.assertEqual(self.client.get("/books/search", params={"q": "1984"}).json(), [])
+        self.assertEqual(len(self.client.get("/books/search", params={"q": "animal"}).json()), 1)
+        
+        self.client.delete("/books/1")
+        self.assertEqual(self.client.get("/books/search", params={"q": "orwell"}).json(), [])
+
 
 class TestBooksAPIWithLiveServer(unittest.TestCase):
     """Test suite using live server (optional - requires server running)"""
@@ -1,12 +1,23 @@
-from flask import Flask, render_template, request
-import pickle
+from flask import Flask, jsonify, render_template, request
+import os
+import sys
 import numpy as np
 
+# model_registry.py is shared with day-20/complete-project; the Docker build
+# copies it in, and a checkout imports it from there
+try:
+    from model_registry import ModelRegistry
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    "..", "..", "..", "..", "..", "day-20", "complete-project"))
+    from model_registry import ModelRegistry
+
 app = Flask(__name__)
 
-# Load the trained model
-with open("model.pkl", "rb") as f:
-    model = pickle.load(f)
+# The trained model is loaded on first request, memory-mapped, and swapped
+# when the artifact file is replaced; the .joblib the trainer writes takes
+# over from the .pkl as soon as it appears
+registry = ModelRegistry(os.environ.get("MODEL_PATH") or ["model.joblib", "model.pkl"])
 
 @app.route('/')
 def home():
@@ -25,8 +36,12 @@ def predict():
         float(request.form['Latitude']),
         float(request.form['Longitude']),
     ]
-    prediction = model.predict([features])[0]
+    prediction = registry.get().predict([features])[0]
     return render_template("result.html", prediction=round(prediction, 2))
 
+@app.route('/model')
+def model_info():
+    return jsonify(registry.stats())
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
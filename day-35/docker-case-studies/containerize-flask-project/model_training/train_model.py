@@ -3,7 +3,33 @@ from sklearn.datasets import fetch_california_housing
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error
-import pickle
+import argparse
+import joblib
+import os
+import sys
+
+# model_search.py is shared with day-20/complete-project
+try:
+    from model_search import search
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    "..", "..", "..", "..", "day-20", "complete-project"))
+    from model_search import search
+
+# Random-search space for --search
+SEARCH_SPACE = {
+    "n_estimators": [50, 100, 200, 300],
+    "max_depth": [None, 10, 20, 30],
+    "min_samples_leaf": [1, 2, 4, 8],
+    "max_features": [1.0, "sqrt", 0.5],
+}
+
+parser = argparse.ArgumentParser(description="Train the California housing model")
+parser.add_argument("--search", type=int, metavar="N", default=0,
+                    help="try N random RandomForest settings with 3-fold CV on all cores")
+parser.add_argument("--workers", type=int, default=None,
+                    help="processes for --search (default: one per CPU)")
+args = parser.parse_args()
 
 data = fetch_california_housing(as_frame=True)
 df = data.frame
@@ -13,12 +39,23 @@ y = df["MedHouseVal"]
 
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-model = RandomForestRegressor(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
+if args.search:
+    model, leaderboard = search(RandomForestRegressor(random_state=42), SEARCH_SPACE, X_train, y_train,
+                                n_iter=args.search, cv=3, scoring="neg_mean_squared_error",
+                                workers=args.workers, random_state=42,
+                                leaderboard_path="leaderboard.csv")
+    print(leaderboard.head(5).to_string(index=False))
+    print("Leaderboard saved to leaderboard.csv")
+else:
+    model = RandomForestRegressor(n_estimators=100, random_state=42)
+    model.fit(X_train, y_train)
 
 y_pred = model.predict(X_test)
 mse = mean_squared_error(y_test, y_pred)
 print(f"Mean Squared Error: {mse}")
 
-with open("../ml-flask-app/app/model.pkl", "wb") as f:
-    pickle.dump(model, f)
\ No newline at end of file
+# Uncompressed joblib so the app can memory-map the trees; written to a temp
+# file and renamed so a running app never loads a half-written model
+path = "../ml-flask-app/app/model.joblib"
+joblib.dump(model, path + ".tmp", compress=0)
+os.replace(path + ".tmp", path)
\ No newline at end of file
@@ -1,31 +1,82 @@
 # Flask backend script
 
 from flask import Flask, request, jsonify
+import json
+import os
+import sys
+import time
 import redis
-import pickle
+
+# model_registry.py is shared with day-20/complete-project; the Docker build
+# copies it in, and a checkout imports it from there
+try:
+    from model_registry import ModelRegistry
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    "..", "..", "..", "..", "..", "day-20", "complete-project"))
+    from model_registry import ModelRegistry
+from prediction_cache import PredictionCache
 
 app = Flask(__name__)
 
 # Connect to Redis
 redis_client = redis.Redis(host="redis", port=6379, decode_responses=True)
 
-# Load the model
-with open("/models/model.pkl", "rb") as f:
-    model = pickle.load(f)
+# Every prediction is appended to this stream for the logging worker; the
+# stream is trimmed to roughly the newest PREDICTION_STREAM_MAXLEN entries
+PREDICTION_STREAM = os.environ.get("PREDICTION_STREAM", "predictions")
+PREDICTION_STREAM_MAXLEN = int(os.environ.get("PREDICTION_STREAM_MAXLEN", "100000"))
+
+# The model is loaded on first request, memory-mapped, and swapped when the
+# artifact file is replaced; the .joblib the trainer writes takes over from
+# the .pkl as soon as it appears
+registry = ModelRegistry(os.environ.get("MODEL_PATH") or ["/models/model.joblib", "/models/model.pkl"])
+
+# Cache of recent predictions; set PREDICTION_CACHE_REDIS=1 to share it
+# between backend replicas through Redis
+prediction_cache = PredictionCache(
+    max_entries=int(os.environ.get("PREDICTION_CACHE_SIZE", "10000")),
+    ttl=float(os.environ.get("PREDICTION_CACHE_TTL", "300")),
+    quantum=float(os.environ.get("PREDICTION_CACHE_QUANTUM", "0.001")),
+    redis_client=redis_client if os.environ.get("PREDICTION_CACHE_REDIS", "0") == "1" else None,
+)
 
 @app.route("/predict", methods=["GET"])
 def predict():
     # Retrieve features from request
     features = request.args
+    start = time.perf_counter()
     try:
-        data = [[float(features.get(key)) for key in sorted(features.keys())]]
-        prediction = model.predict(data)[0]
-        
-        # Log prediction in Redis
-        redis_client.set("latest_prediction", prediction)
+        values = {key: float(features.get(key)) for key in features.keys()}
+        data = [[values[key] for key in sorted(values)]]
+        # Cached predictions are keyed by the artifact the serving model was
+        # loaded from, so a swapped-in model never reuses the old one's entries
+        model, tag = registry.get_tagged()
+        prediction, source = prediction_cache.get_or_compute(
+            values, lambda: float(model.predict(data)[0]), namespace=tag)
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        # Log prediction in Redis; losing a log entry must not fail the request
+        try:
+            redis_client.xadd(PREDICTION_STREAM, {
+                "prediction": prediction,
+                "features": json.dumps(values),
+                "latency_ms": f"{latency_ms:.3f}",
+                "source": source,
+            }, maxlen=PREDICTION_STREAM_MAXLEN, approximate=True)
+        except redis.RedisError as e:
+            app.logger.warning("Could not log prediction: %s", e)
         return jsonify({"prediction": prediction})
     except Exception as e:
         return jsonify({"error": str(e)})
 
+@app.route("/model", methods=["GET"])
+def model_info():
+    return jsonify(registry.stats())
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify(prediction_cache.stats())
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000)
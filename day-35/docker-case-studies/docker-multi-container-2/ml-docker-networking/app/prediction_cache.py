@@ -0,0 +1,101 @@
+# Prediction cache for the Flask backend
+#
+# Inputs are canonicalised before lookup: keys are sorted and every value is
+# bucketed to a multiple of `quantum`, so near-identical slider positions share
+# an entry. Lookups go to a local LRU first, then (optionally) to Redis so all
+# backend replicas share results.
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+
+    def __init__(self, max_entries=10000, ttl=300, quantum=0.001, redis_client=None, prefix="prediction-cache:"):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.quantum = quantum
+        self.redis = redis_client
+        self.prefix = prefix
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.redis_errors = 0
+
+    def key(self, features, namespace=""):
+        parts = (f"{name}={round(float(value) / self.quantum)}" for name, value in sorted(features.items()))
+        return namespace + ":" + "|".join(parts)
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return value
+
+    def _set_local(self, key, value):
+        with self._lock:
+            self._local[key] = (value, time.monotonic() + self.ttl)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def _get_redis(self, key):
+        # Redis trouble only costs us the shared tier, never the request
+        try:
+            raw = self.redis.get(self.prefix + key)
+        except Exception:
+            self.redis_errors += 1
+            return None
+        return None if raw is None else json.loads(raw)
+
+    def _set_redis(self, key, value):
+        try:
+            self.redis.set(self.prefix + key, json.dumps(value), ex=max(1, int(self.ttl)))
+        except Exception:
+            self.redis_errors += 1
+
+    def get_or_compute(self, features, compute, namespace=""):
+        # Returns (value, source) with source "local", "redis" or "model".
+        # namespace separates entries made by different model versions.
+        key = self.key(features, namespace)
+        value = self._get_local(key)
+        if value is not None:
+            self.local_hits += 1
+            return value, "local"
+        if self.redis is not None:
+            value = self._get_redis(key)
+            if value is not None:
+                self.redis_hits += 1
+                self._set_local(key, value)
+                return value, "redis"
+        self.misses += 1
+        value = compute()
+        self._set_local(key, value)
+        if self.redis is not None:
+            self._set_redis(key, value)
+        return value, "model"
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+
+    def stats(self):
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "entries": len(self._local),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "redis_errors": self.redis_errors,
+            "hit_rate": (self.local_hits + self.redis_hits) / lookups if lookups else 0.0,
+            "redis_enabled": self.redis is not None,
+        }
@@ -0,0 +1,131 @@
+import importlib
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from prediction_cache import PredictionCache
+
+try:
+    import fakeredis
+except ImportError:  # pip install fakeredis
+    fakeredis = None
+
+
+class TestPredictionCache(unittest.TestCase):
+    """Tests for the local and Redis tiers of the prediction cache"""
+
+    def setUp(self):
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return 2.5
+
+    def test_quantised_inputs_share_an_entry(self):
+        """Values in the same bucket hit the cached prediction"""
+        cache = PredictionCache(quantum=0.1)
+        cache.get_or_compute({"MedInc": 5.01, "HouseAge": 20}, self.compute)
+        value, source = cache.get_or_compute({"HouseAge": 20.0, "MedInc": 4.99}, self.compute)
+
+        self.assertEqual((value, source), (2.5, "local"))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(cache.stats()["hit_rate"], 0.5)
+
+    def test_lru_bound(self):
+        """The oldest entry is evicted once the cache is full"""
+        cache = PredictionCache(max_entries=2)
+        for value in (1, 2, 3):
+            cache.get_or_compute({"x": value}, self.compute)
+
+        self.assertEqual(cache.stats()["entries"], 2)
+        cache.get_or_compute({"x": 1}, self.compute)
+        self.assertEqual(self.calls, 4)
+
+    def test_expired_entries_are_recomputed(self):
+        """Entries older than the TTL are not served"""
+        cache = PredictionCache(ttl=0)
+        cache.get_or_compute({"x": 1}, self.compute)
+        cache.get_or_compute({"x": 1}, self.compute)
+        self.assertEqual(self.calls, 2)
+
+    @unittest.skipIf(fakeredis is None, "fakeredis not installed")
+    def test_redis_tier_is_shared(self):
+        """A second replica finds the prediction in Redis"""
+        server = fakeredis.FakeServer()
+        first = PredictionCache(redis_client=fakeredis.FakeRedis(server=server, decode_responses=True))
+        second = PredictionCache(redis_client=fakeredis.FakeRedis(server=server, decode_responses=True))
+
+        first.get_or_compute({"x": 1}, self.compute)
+        value, source = second.get_or_compute({"x": 1}, self.compute)
+
+        self.assertEqual((value, source), (2.5, "redis"))
+        self.assertEqual(self.calls, 1)
+
+    def test_redis_failure_falls_back_to_model(self):
+        """A broken Redis connection does not fail the prediction"""
+        class BrokenRedis:
+            def get(self, key):
+                raise ConnectionError("redis down")
+
+            def set(self, key, value, ex=None):
+                raise ConnectionError("redis down")
+
+        cache = PredictionCache(redis_client=BrokenRedis())
+        value, source = cache.get_or_compute({"x": 1}, self.compute)
+
+        self.assertEqual((value, source), (2.5, "model"))
+        self.assertEqual(cache.stats()["redis_errors"], 2)
+
+
+@unittest.skipIf(fakeredis is None, "fakeredis not installed")
+class TestModelSwap(unittest.TestCase):
+    """Cached predictions follow the model that is actually serving"""
+
+    def setUp(self):
+        from sklearn.linear_model import LinearRegression
+
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "model.joblib")
+        sys.modules.pop("app", None)
+        with mock.patch.dict(os.environ, {"MODEL_PATH": self.path}):
+            self.app = importlib.import_module("app")
+
+        # Importing app made the shared model_registry importable
+        from model_registry import save_model
+
+        self.LinearRegression, self.save_model = LinearRegression, save_model
+        self.publish(2.0)
+        self.app.redis_client = fakeredis.FakeRedis(decode_responses=True)
+        self.app.registry.check_interval = 3600
+        self.client = self.app.app.test_client()
+
+    def tearDown(self):
+        sys.modules.pop("app", None)
+        self.folder.cleanup()
+
+    def publish(self, value):
+        model = self.LinearRegression().fit([[0.0], [1.0]], [value, value])
+        self.save_model(model, self.path)
+
+    def predict(self):
+        return self.client.get("/predict?x=1").get_json()["prediction"]
+
+    def test_swapped_model_is_not_served_from_cache(self):
+        """After the artifact is replaced, the new model's output is returned"""
+        self.assertAlmostEqual(self.predict(), 2.0)
+        self.assertAlmostEqual(self.predict(), 2.0)
+
+        # Until the registry's next check the old model is still serving
+        self.publish(20.0)
+        self.assertAlmostEqual(self.predict(), 2.0)
+
+        self.app.registry._next_check = 0  # the check interval has passed
+        self.assertAlmostEqual(self.predict(), 20.0)
+        self.assertAlmostEqual(self.predict(), 20.0)
+        self.assertEqual(self.app.registry.version, 2)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
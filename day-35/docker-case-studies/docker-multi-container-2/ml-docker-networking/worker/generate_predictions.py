@@ -1,14 +1,80 @@
 # Worker script to log predictions
+#
+# Reads the "predictions" stream written by the Flask app as part of a
+# consumer group, so each prediction goes to one worker even when several run,
+# and nothing is lost between reads. Entries are read in blocking
+# batches, written to the log in one go and then acknowledged; a worker that
+# dies before acking gets its pending entries back on restart. Set a stable
+# PREDICTION_CONSUMER per worker; entries another consumer left pending for
+# longer than PREDICTION_CLAIM_IDLE_MS (e.g. a renamed or scaled-down worker)
+# are claimed on startup too.
 
+import os
+import socket
 import redis
-import time
 
-# Connect to Redis
-redis_client = redis.Redis(host="redis", port=6379, decode_responses=True)
+STREAM = os.environ.get("PREDICTION_STREAM", "predictions")
+GROUP = os.environ.get("PREDICTION_GROUP", "prediction-loggers")
+CONSUMER = os.environ.get("PREDICTION_CONSUMER", socket.gethostname())
+BATCH_SIZE = int(os.environ.get("PREDICTION_BATCH_SIZE", "500"))
+BLOCK_MS = int(os.environ.get("PREDICTION_BLOCK_MS", "5000"))
+LOG_FILE = os.environ.get("PREDICTION_LOG_FILE", "/logs/predictions.log")
+CLAIM_IDLE_MS = int(os.environ.get("PREDICTION_CLAIM_IDLE_MS", "60000"))
 
-while True:
-    prediction = redis_client.get("latest_prediction")
-    if prediction:
-        with open("/logs/predictions.log", "a") as log_file:
-            log_file.write(f"Prediction logged: {prediction}\n")
-    time.sleep(5)  # Log every 5 seconds
+
+def ensure_group(client):
+    try:
+        client.xgroup_create(STREAM, GROUP, id="0", mkstream=True)
+    except redis.ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def claim_stale(client):
+    # Moves entries idle for CLAIM_IDLE_MS to this consumer's pending list,
+    # where the "0" reads in run() pick them up
+    start_id = "0-0"
+    while True:
+        start_id = client.xautoclaim(STREAM, GROUP, CONSUMER, CLAIM_IDLE_MS,
+                                     start_id=start_id, count=BATCH_SIZE)[0]
+        if start_id == "0-0":
+            return
+
+
+def format_entry(fields):
+    return (f"Prediction logged: {fields.get('prediction')} "
+            f"features={fields.get('features')} "
+            f"latency_ms={fields.get('latency_ms')} "
+            f"source={fields.get('source')}\n")
+
+
+def process_batch(client, log_file, start_id):
+    # start_id "0" re-reads our own unacknowledged entries, ">" reads new ones
+    block = None if start_id == "0" else BLOCK_MS
+    response = client.xreadgroup(GROUP, CONSUMER, {STREAM: start_id}, count=BATCH_SIZE, block=block)
+    if not response:
+        return 0
+    entries = response[0][1]
+    if not entries:
+        return 0
+    # A pending entry the app's MAXLEN trimming has since deleted comes back
+    # with no fields; there is nothing to log, but it is still acknowledged
+    log_file.write("".join(format_entry(fields) for _, fields in entries if fields))
+    log_file.flush()
+    client.xack(STREAM, GROUP, *[entry_id for entry_id, _ in entries])
+    return len(entries)
+
+
+def run(client):
+    ensure_group(client)
+    claim_stale(client)
+    with open(LOG_FILE, "a", buffering=1024 * 1024) as log_file:
+        while process_batch(client, log_file, "0"):
+            pass
+        while True:
+            process_batch(client, log_file, ">")
+
+
+if __name__ == "__main__":
+    # Connect to Redis
+    run(redis.Redis(host="redis", port=6379, decode_responses=True))
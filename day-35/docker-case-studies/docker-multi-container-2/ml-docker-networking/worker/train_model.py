@@ -1,6 +1,7 @@
 # Script to train and save the model
 
-import pickle
+import joblib
+import os
 from sklearn.datasets import fetch_california_housing
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
@@ -15,8 +16,9 @@ X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_
 model = RandomForestRegressor()
 model.fit(X_train, y_train)
 
-# Save the trained model
-with open("/models/model.pkl", "wb") as f:
-    pickle.dump(model, f)
+# Save the trained model (uncompressed joblib so the app can memory-map it;
+# renamed into place so the running app never loads a half-written file)
+joblib.dump(model, "/models/model.joblib.tmp", compress=0)
+os.replace("/models/model.joblib.tmp", "/models/model.joblib")
 
-print("Model trained and saved to /models/model.pkl")
+print("Model trained and saved to /models/model.joblib")
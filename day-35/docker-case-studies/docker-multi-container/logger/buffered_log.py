@@ -0,0 +1,155 @@
+# buffered_log.py
+# Batched, rotating append-only log file shared by the logger services (the
+# Flask one here and the FastAPI one in day-36); each service only adds its
+# routes and starts and stops the flusher.
+from collections import deque
+import gzip
+import os
+import shutil
+import threading
+import time
+
+LOG_FILE = os.getenv("LOG_FILE", "logs/logs.txt")
+
+# Events wait in memory and are written in one go when LOG_FLUSH_LINES are
+# pending or every LOG_FLUSH_INTERVAL seconds, whichever comes first
+LOG_BUFFER_LINES = int(os.getenv("LOG_BUFFER_LINES", "100000"))
+LOG_FLUSH_LINES = int(os.getenv("LOG_FLUSH_LINES", "1000"))
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "1.0"))
+
+# The file is rotated once it reaches LOG_MAX_BYTES, keeping LOG_BACKUPS old
+# segments (logs.txt.1 is the newest), gzipped if LOG_GZIP=1
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "5"))
+LOG_GZIP = os.getenv("LOG_GZIP", "0") == "1"
+
+
+class BufferedLog:
+    # Requests only append to an in-memory ring buffer; one background thread
+    # keeps the file open and writes everything pending with a single write().
+    # If the disk falls behind and the buffer fills up, the oldest unwritten
+    # lines are dropped and counted instead of blocking requests.
+    def __init__(self, path, capacity, flush_lines, flush_interval, max_bytes, backups, compress):
+        self.path = path
+        self.capacity = capacity
+        self.flush_lines = flush_lines
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.compress = compress
+        self._buffer = deque(maxlen=capacity)
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = None
+        self._file = None
+        self.dropped = 0
+        self.written = 0
+        self.flushes = 0
+        self.rotations = 0
+        self.last_flush_ms = None
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+        self.last_error = None
+
+    @classmethod
+    def from_env(cls):
+        # Configured from the LOG_* environment variables above
+        return cls(LOG_FILE, LOG_BUFFER_LINES, LOG_FLUSH_LINES, LOG_FLUSH_INTERVAL, LOG_MAX_BYTES, LOG_BACKUPS, LOG_GZIP)
+
+    def start(self):
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="log-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        # Wakes the flusher, which writes whatever is left and closes the file
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def append(self, lines):
+        with self._cond:
+            overflow = len(self._buffer) + len(lines) - self.capacity
+            if overflow > 0:
+                self.dropped += overflow
+            self._buffer.extend(lines)
+            if len(self._buffer) >= self.flush_lines:
+                self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopping and len(self._buffer) < self.flush_lines:
+                    self._cond.wait(self.flush_interval)
+                lines, self._buffer = self._buffer, deque(maxlen=self.capacity)
+                stopping = self._stopping
+            if lines:
+                self._write(lines)
+            if stopping:
+                break
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, lines):
+        start = time.perf_counter()
+        try:
+            if self._file is None:
+                folder = os.path.dirname(self.path)
+                if folder:
+                    os.makedirs(folder, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+            self.written += len(lines)
+            if self.max_bytes and self._file.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            self.last_error = repr(e)
+            self.dropped += len(lines)
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.flushes += 1
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self.total_flush_ms += elapsed_ms
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        if self.backups <= 0:
+            os.remove(self.path)
+        else:
+            suffix = ".gz" if self.compress else ""
+            for i in range(self.backups - 1, 0, -1):
+                older = f"{self.path}.{i}{suffix}"
+                if os.path.exists(older):
+                    os.replace(older, f"{self.path}.{i + 1}{suffix}")
+            newest = f"{self.path}.1"
+            os.replace(self.path, newest)
+            if self.compress:
+                with open(newest, "rb") as src, gzip.open(newest + ".gz", "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(newest)
+        self.rotations += 1
+
+    def stats(self):
+        return {
+            "queue_depth": len(self._buffer),
+            "capacity": self.capacity,
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "rotations": self.rotations,
+            "last_flush_ms": self.last_flush_ms,
+            "max_flush_ms": self.max_flush_ms,
+            "avg_flush_ms": self.total_flush_ms / self.flushes if self.flushes else None,
+            "last_error": self.last_error,
+        }
+
+
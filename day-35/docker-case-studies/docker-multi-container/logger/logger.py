@@ -1,18 +1,41 @@
 from flask import Flask, request
+import atexit
 import json
-import os
+
+from buffered_log import BufferedLog
 
 app = Flask(__name__)
 
-LOG_FILE = "logs/logs.txt"
+buffered_log = BufferedLog.from_env()
+buffered_log.start()
+atexit.register(buffered_log.stop)
 
 @app.route('/log', methods=['POST'])
 def log_request():
     data = request.json
-    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-    with open(LOG_FILE, 'a') as f:
-        f.write(json.dumps(data) + '\n')
+    buffered_log.append([json.dumps(data)])
     return {"status": "logged"}
 
+@app.route('/log/batch', methods=['POST'])
+def log_batch():
+    # A JSON array of events, or one event per line with
+    # Content-Type: application/x-ndjson
+    body = request.get_data()
+    try:
+        if (request.content_type or '').startswith('application/x-ndjson'):
+            events = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            events = json.loads(body)
+    except ValueError as e:
+        return {"error": f"Invalid JSON: {e}"}, 400
+    if not isinstance(events, list):
+        return {"error": "Expected a JSON array"}, 400
+    buffered_log.append([json.dumps(event) for event in events])
+    return {"status": "logged", "count": len(events)}
+
+@app.route('/log/stats', methods=['GET'])
+def log_stats():
+    return buffered_log.stats()
+
 if __name__ == "__main__":
     app.run(host='0.0.0.0', port=5003)
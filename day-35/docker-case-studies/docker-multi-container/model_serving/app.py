@@ -1,5 +1,12 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
+import io
+import json
 import pickle
+import numpy as np
+
+# Binary framings accepted (and, for .npy, returned) by /predict/batch
+NPY_TYPE = 'application/x-npy'
+ARROW_TYPE = 'application/vnd.apache.arrow.stream'
 
 app = Flask(__name__)
 
@@ -14,5 +21,45 @@ def predict():
     prediction = model.predict([features])[0]
     return jsonify({'prediction': prediction})
 
+def parse_instances(content_type, body):
+    # The whole batch becomes one 2-D float32 array in a single conversion,
+    # then goes through the model in one vectorised call
+    if content_type.startswith(NPY_TYPE):
+        X = np.load(io.BytesIO(body), allow_pickle=False)
+    elif content_type.startswith(ARROW_TYPE):
+        import pyarrow as pa  # optional, only needed for Arrow input
+        table = pa.ipc.open_stream(body).read_all()
+        X = np.column_stack([column.to_numpy() for column in table.columns])
+    else:
+        X = json.loads(body)['instances']
+    X = np.asarray(X, dtype=np.float32)
+    expected = getattr(model, 'n_features_in_', None)
+    if X.shape[:1] == (0,):
+        # An empty batch, e.g. {"instances": []}, gets an empty answer
+        return X.reshape(0, expected or (X.shape[1] if X.ndim == 2 else 0))
+    if X.ndim != 2:
+        raise ValueError('instances must be a 2-D array of numbers')
+    if not np.isfinite(X).all():
+        raise ValueError('instances must not contain NaN or infinity')
+    if expected is not None and X.shape[1] != expected:
+        raise ValueError(f'expected {expected} features per instance, got {X.shape[1]}')
+    return X
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    try:
+        X = parse_instances(request.content_type or 'application/json', request.get_data())
+    except ImportError:
+        return jsonify({'error': 'Arrow input needs pyarrow installed'}), 415
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid instances: {e}'}), 400
+
+    predictions = np.asarray(model.predict(X), dtype=np.float64) if len(X) else np.empty(0)
+    if NPY_TYPE in request.headers.get('Accept', ''):
+        buffer = io.BytesIO()
+        np.save(buffer, predictions, allow_pickle=False)
+        return Response(buffer.getvalue(), mimetype=NPY_TYPE)
+    return jsonify({'predictions': predictions.tolist()})
+
 if __name__ == "__main__":
     app.run(host='0.0.0.0', port=5001)
@@ -1,13 +1,141 @@
+from contextlib import asynccontextmanager
 from typing import List
+import asyncio
+import logging
 import os
-import requests
+import time
+import httpx
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 
 MODEL_SERVING_URL = os.getenv("MODEL_SERVING_URL", "http://model_serving:5001/predict")
 LOGGER_URL = os.getenv("LOGGER_URL", "http://logger:5003/log")
 
-app = FastAPI(title="Backend API", version="1.0.0")
+# Per-upstream timeouts (seconds)
+MODEL_SERVING_TIMEOUT = float(os.getenv("MODEL_SERVING_TIMEOUT", "2.0"))
+LOGGER_TIMEOUT = float(os.getenv("LOGGER_TIMEOUT", "1.0"))
+
+# Log events waiting to be sent; when full, new events are dropped rather
+# than slowing down predictions
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Circuit breaker: after this many consecutive failures an upstream is not
+# called for CIRCUIT_RESET_SECONDS, then one trial request is let through
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "10"))
+
+log = logging.getLogger("backend")
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+    def record_cancelled(self):
+        # The call was abandoned (e.g. the client disconnected), which says
+        # nothing about the upstream: only free a half-open trial slot
+        self.trial_in_flight = False
+
+
+class Upstreams:
+    # One pooled, keep-alive HTTP client shared by every request, plus the
+    # background task that ships log events
+    def __init__(self):
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+        self.model_breaker = CircuitBreaker("model_serving", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)
+        self.logger_breaker = CircuitBreaker("logger", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)
+        self.log_queue: asyncio.Queue = asyncio.Queue(maxsize=LOG_QUEUE_SIZE)
+        self.logs_dropped = 0
+        self.log_task = asyncio.create_task(self._ship_logs())
+
+    async def close(self):
+        self.log_task.cancel()
+        try:
+            await self.log_task
+        except asyncio.CancelledError:
+            pass
+        await self.client.aclose()
+
+    def enqueue_log(self, event: dict):
+        try:
+            self.log_queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.logs_dropped += 1
+
+    async def _ship_logs(self):
+        while True:
+            event = await self.log_queue.get()
+            if not self.logger_breaker.allow():
+                self.logs_dropped += 1
+                continue
+            # Every exit records a result, so a half-open trial is never left
+            # in flight, and no single event can stop the shipping loop
+            sent = cancelled = False
+            try:
+                response = await self.client.post(LOGGER_URL, json=event, timeout=LOGGER_TIMEOUT)
+                response.raise_for_status()
+                sent = True
+            except httpx.HTTPError as e:
+                log.warning("Could not send log event: %s", e)
+            except Exception:
+                log.exception("Unexpected error sending log event")
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            finally:
+                if sent:
+                    self.logger_breaker.record_success()
+                elif cancelled:
+                    self.logger_breaker.record_cancelled()
+                    self.logs_dropped += 1
+                else:
+                    self.logger_breaker.record_failure()
+                    self.logs_dropped += 1
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.upstreams = Upstreams()
+    yield
+    await app.state.upstreams.close()
+
+
+app = FastAPI(title="Backend API", version="1.0.0", lifespan=lifespan)
 
 class FeaturesRequest(BaseModel):
     features: List[float]
@@ -17,24 +145,56 @@ class PredictionResponse(BaseModel):
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    upstreams = app.state.upstreams
+    return {
+        "status": "ok",
+        "model_serving_circuit": upstreams.model_breaker.state,
+        "logger_circuit": upstreams.logger_breaker.state,
+        "log_queue_depth": upstreams.log_queue.qsize(),
+        "logs_dropped": upstreams.logs_dropped,
+    }
 
 @app.post("/predict", response_model=PredictionResponse)
-def get_prediction(payload: FeaturesRequest):
+async def get_prediction(payload: FeaturesRequest):
+    upstreams = app.state.upstreams
+    breaker = upstreams.model_breaker
+    if not breaker.allow():
+        raise HTTPException(status_code=503, detail="model_serving is unavailable (circuit open)")
+
+    # forward to model serving; every way out of this block records a result,
+    # which also ends a half-open trial. A cancelled request (the client went
+    # away) only ends the trial and does not count as a failure.
+    healthy = cancelled = False
     try:
-        # forward to model serving
-        response = requests.post(MODEL_SERVING_URL, json={"features": payload.features}, timeout=5)
+        response = await upstreams.client.post(
+            MODEL_SERVING_URL, json={"features": payload.features}, timeout=MODEL_SERVING_TIMEOUT
+        )
         response.raise_for_status()
         data = response.json()
+        healthy = True
+    except httpx.HTTPStatusError as e:
+        # the upstream answered, so it is up; only 5xx count against it
+        healthy = e.response.status_code < 500
+        raise HTTPException(status_code=e.response.status_code, detail=str(e))
+    except httpx.TimeoutException as e:
+        raise HTTPException(status_code=504, detail=f"model_serving timed out: {e}")
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"model_serving unreachable: {e}")
+    except ValueError as e:
+        # a 2xx whose body is not JSON (e.g. an HTML error page from a proxy)
+        raise HTTPException(status_code=502, detail=f"model_serving returned an invalid response: {e}")
+    except asyncio.CancelledError:
+        cancelled = True
+        raise
+    finally:
+        if healthy:
+            breaker.record_success()
+        elif cancelled:
+            breaker.record_cancelled()
+        else:
+            breaker.record_failure()
 
-        # optional logging
-        try:
-            requests.post(LOGGER_URL, json={"event": "prediction", "features": payload.features, "result": data}, timeout=2)
-        except Exception:
-            pass
+    # optional logging, sent in the background
+    upstreams.enqueue_log({"event": "prediction", "features": payload.features, "result": data})
 
-        return data
-    except requests.HTTPError as e:
-        raise HTTPException(status_code=e.response.status_code, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return data
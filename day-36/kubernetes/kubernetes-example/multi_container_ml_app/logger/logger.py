@@ -1,13 +1,53 @@
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+import json
+import os
+import sys
+from fastapi import FastAPI, HTTPException, Request
 
-app = FastAPI(title="Logger Service", version="1.0.0")
+# buffered_log.py is shared with the day-35 Flask logger; the Docker build
+# copies it in, and a checkout imports it from there
+try:
+    from buffered_log import BufferedLog
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "..",
+                                    "day-35", "docker-case-studies", "docker-multi-container", "logger"))
+    from buffered_log import BufferedLog
+
+buffered_log = BufferedLog.from_env()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    buffered_log.start()
+    yield
+    buffered_log.stop()
+
+
+app = FastAPI(title="Logger Service", version="1.0.0", lifespan=lifespan)
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    return {"status": "ok", **buffered_log.stats()}
 
 @app.post("/log")
 async def log(request: Request):
     data = await request.json()
-    print("[LOGGER] ", data)
+    buffered_log.append([json.dumps(data)])
     return {"logged": True}
+
+@app.post("/log/batch")
+async def log_batch(request: Request):
+    # A JSON array of events, or one event per line with
+    # Content-Type: application/x-ndjson
+    body = await request.body()
+    try:
+        if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+            events = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            events = json.loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid JSON: {e}")
+    if not isinstance(events, list):
+        raise HTTPException(status_code=422, detail="Expected a JSON array")
+    buffered_log.append([json.dumps(event) for event in events])
+    return {"logged": len(events)}
@@ -1,7 +1,16 @@
 from typing import List
-from fastapi import FastAPI
+import io
+import json
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+# Binary framings accepted (and, for .npy, returned) by /predict/batch
+NPY_TYPE = "application/x-npy"
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+
 app = FastAPI(title="Model Serving", version="1.0.0")
 
 class FeaturesRequest(BaseModel):
@@ -14,8 +23,55 @@ class PredictionResponse(BaseModel):
 def health():
     return {"status": "ok"}
 
+def model_predict(X: np.ndarray) -> np.ndarray:
+    # Simple example model: sum the features of each row
+    return X.sum(axis=1, dtype=np.float64)
+
 @app.post("/predict", response_model=PredictionResponse)
 def predict(payload: FeaturesRequest):
-    # Simple example model: sum the features
-    pred = float(sum(payload.features))
+    pred = float(model_predict(np.asarray([payload.features], dtype=np.float64))[0])
     return {"prediction": pred}
+
+def parse_instances(content_type: str, body: bytes) -> np.ndarray:
+    # The whole batch becomes one 2-D float32 array in a single conversion,
+    # instead of validating every number as a separate Python object
+    if content_type.startswith(NPY_TYPE):
+        X = np.load(io.BytesIO(body), allow_pickle=False)
+    elif content_type.startswith(ARROW_TYPE):
+        import pyarrow as pa  # optional, only needed for Arrow input
+        table = pa.ipc.open_stream(body).read_all()
+        X = np.column_stack([column.to_numpy() for column in table.columns])
+    else:
+        X = json.loads(body)["instances"]
+    X = np.asarray(X, dtype=np.float32)
+    if X.shape[:1] == (0,):
+        # An empty batch, e.g. {"instances": []}, gets an empty answer
+        return X.reshape(0, X.shape[1] if X.ndim == 2 else 0)
+    if X.ndim != 2:
+        raise ValueError("instances must be a 2-D array of numbers")
+    if not np.isfinite(X).all():
+        raise ValueError("instances must not contain NaN or infinity")
+    return X
+
+def score_batch(content_type: str, accept: str, body: bytes) -> Response:
+    try:
+        X = parse_instances(content_type, body)
+    except ImportError:
+        raise HTTPException(status_code=415, detail="Arrow input needs pyarrow installed")
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid instances: {e}")
+
+    predictions = model_predict(X)
+    if NPY_TYPE in accept:
+        buffer = io.BytesIO()
+        np.save(buffer, predictions, allow_pickle=False)
+        return Response(content=buffer.getvalue(), media_type=NPY_TYPE)
+    return JSONResponse({"predictions": predictions.tolist()})
+
+@app.post("/predict/batch")
+async def predict_batch(request: Request):
+    # Parsing, scoring and encoding a large batch is CPU work, so it runs in a
+    # worker thread and /health and other requests are served meanwhile
+    body = await request.body()
+    return await run_in_threadpool(score_batch, request.headers.get("content-type", "application/json"),
+                                   request.headers.get("accept", ""), body)
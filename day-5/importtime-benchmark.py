@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+
+# Import cost of the day-5 packages, measured with "python -X importtime".
+# Each statement runs in a fresh interpreter; the modules a bare interpreter
+# already loads are subtracted, and the best of REPEAT runs is reported.
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPEAT = 7
+TARGET_MS = 5.0
+
+CASES = [
+    ("primesapp", "import ppackage"),
+    ("primesapp", "from ppackage import checkprime"),
+    ("primesapp", "from ppackage import getAllPrimes; getAllPrimes(1, 100)"),
+    ("myapp", "import mypackage"),
+    ("myapp", "from mypackage import average"),
+    ("strapp", "import strops"),
+    ("strapp", "from strops import makeTitle"),
+]
+
+
+def importtime(folder, statement):
+    # Returns {module: cumulative microseconds} for top-level imports
+    env = dict(os.environ, PYTHONPATH=os.path.join(HERE, folder), PYTHONDONTWRITEBYTECODE="")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            env=env, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name[1:].startswith(" "):  # nested imports are already counted
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def measure(folder, statement, baseline):
+    best = None
+    for _ in range(REPEAT):
+        times = importtime(folder, statement)
+        total = sum(us for name, us in times.items() if name not in baseline)
+        best = total if best is None else min(best, total)
+    return best / 1000
+
+
+def main():
+    baseline = set(importtime(HERE, "pass"))
+    print(f"{'statement':<62} {'ms':>7}")
+    for folder, statement in CASES:
+        ms = measure(folder, statement, baseline)
+        status = "ok" if ms < TARGET_MS else f"over {TARGET_MS:g} ms"
+        print(f"{statement:<62} {ms:7.2f}  {status}")
+
+
+if __name__ == "__main__":
+    main()
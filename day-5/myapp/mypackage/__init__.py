@@ -1,2 +1,24 @@
-from .myfunctions import average, power, sum
-from .greet import sayhello
+# average/power/sum and sayhello are imported from their modules the first
+# time they are used (PEP 562)
+import importlib
+
+_LAZY = {
+    "average": ".myfunctions",
+    "power": ".myfunctions",
+    "sum": ".myfunctions",
+    "sayhello": ".greet",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1 +1,23 @@
-from .primes import checkprime, getAllPrimes, getHighestPrime
\ No newline at end of file
+# The functions are loaded from ppackage.primes on first use (PEP 562), so
+# "import ppackage" costs next to nothing until something is called
+import importlib
+
+_LAZY = {
+    "checkprime": ".primes",
+    "getAllPrimes": ".primes",
+    "getHighestPrime": ".primes",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,26 +1,183 @@
-def checkprime(n):
-    """Checks wether a number is prime or not"""
-    for i in range(2, n):
-        if(n % i == 0):
+from array import array
+from itertools import compress
+from math import isqrt
+
+# Prime table shared by every call: (limit, flags, primes) where flags[i] is 1
+# when i is prime, for 0 <= i <= limit. It only grows, and is replaced as a
+# whole so readers always see a consistent snapshot.
+_table = (1, bytearray(2), [])
+
+# Numbers up to this are answered from the table (growing it if needed);
+# bigger ones go through Miller-Rabin
+TABLE_LIMIT = 1_000_000
+
+# Numbers per sieve segment in getAllPrimes/getHighestPrime
+SEGMENT_SIZE = 1 << 18
+
+# With workers=, each process gets at least this many numbers per task, and
+# there are about this many tasks per worker so uneven segments balance out
+MIN_TASK_SIZE = 4 * SEGMENT_SIZE
+TASKS_PER_WORKER = 4
+
+# Miller-Rabin with these bases is exact below 3.3 * 10**24; above that a
+# "True" means a strong probable prime
+_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+def _prime_table(limit):
+    """Returns the cached (limit, flags, primes), sieving further if needed"""
+    global _table
+    table = _table
+    if table[0] >= limit:
+        return table
+    limit = max(limit, 2 * table[0])
+    flags = bytearray([1]) * (limit + 1)
+    flags[0] = flags[1] = 0
+    for p in range(2, isqrt(limit) + 1):
+        if flags[p]:
+            flags[p * p::p] = bytes(len(range(p * p, limit + 1, p)))
+    table = _table = (limit, flags, list(compress(range(limit + 1), flags)))
+    return table
+
+
+def _sieve_segment(lo, hi):
+    """Primes in [lo, hi] (lo >= 2), crossed off with the cached base primes"""
+    size = hi - lo + 1
+    flags = bytearray([1]) * size
+    for p in _prime_table(isqrt(hi))[2]:
+        if p * p > hi:
+            break
+        start = max(p * p, (lo + p - 1) // p * p)
+        if start <= hi:
+            flags[start - lo::p] = bytes(len(range(start - lo, size, p)))
+    return compress(range(lo, hi + 1), flags)
+
+
+def _primes_between(lo, hi):
+    """Primes in [lo, hi] (lo >= 2), in increasing order"""
+    while lo <= hi:
+        top = min(hi, lo + SEGMENT_SIZE - 1)
+        yield from _sieve_segment(lo, top)
+        lo = top + 1
+
+
+def _highest_between(lo, hi):
+    """Highest prime in [lo, hi] (lo >= 2), or None"""
+    while hi >= lo:
+        bottom = max(lo, hi - SEGMENT_SIZE + 1)
+        primes = list(_sieve_segment(bottom, hi))
+        if primes:
+            return primes[-1]
+        hi = bottom - 1
+    return None
+
+
+def _init_worker(table):
+    # Base primes come from the parent once per process instead of being
+    # sieved again in every worker
+    global _table
+    _table = table
+
+
+def _packed_primes(lo, hi):
+    # Packed 64-bit ints pickle far faster than a list of Python ints
+    return array("Q", _primes_between(lo, hi)).tobytes()
+
+
+def _partition(lo, hi, workers):
+    """Splits [lo, hi] into consecutive (start, end) ranges for the pool"""
+    size = max(MIN_TASK_SIZE, -(-(hi - lo + 1) // (workers * TASKS_PER_WORKER)))
+    return [(start, min(hi, start + size - 1)) for start in range(lo, hi + 1, size)]
+
+
+def _pool(workers, n):
+    # Imported here: concurrent.futures.process pulls in multiprocessing,
+    # which would add tens of milliseconds to every "import ppackage"
+    from concurrent.futures import ProcessPoolExecutor
+    return ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(_prime_table(isqrt(n)),))
+
+
+def _miller_rabin(n):
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in _WITNESSES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
             return False
     return True
 
-def getHighestPrime(m, n):
-    """Gives you the highest prime number in a given range m, n"""
-    for i in range(n , m - 1, -1):
-        if(checkprime(i)):
-            return i
+
+def checkprime(n):
+    """Checks wether a number is prime or not"""
+    # Numbers below 2 have always been reported as prime; kept as is so
+    # existing callers get the same answers
+    if n < 2:
+        return True
+    if n <= TABLE_LIMIT:
+        return bool(_prime_table(n)[1][n])
+    for p in _WITNESSES:
+        if n % p == 0:
+            return n == p
+    return _miller_rabin(n)
+
+def getHighestPrime(m, n, workers=None):
+    """Gives you the highest prime number in a given range m, n
+
+    workers: number of processes to sieve with (default: this one only)"""
+    hi = n
+    if hi > TABLE_LIMIT * TABLE_LIMIT:
+        # Sieving would need base primes up to sqrt(n); primes are dense
+        # enough that walking down with Miller-Rabin is quicker
+        while hi > TABLE_LIMIT and hi >= m:
+            if checkprime(hi):
+                return hi
+            hi -= 1
+    lo = max(m, 2)
+    if hi >= lo:
+        parts = _partition(lo, hi, workers) if workers and workers > 1 else []
+        if len(parts) > 1:
+            # All ranges are queued top first; the first one (in that order)
+            # holding a prime has the answer, and the rest are cancelled
+            with _pool(workers, hi) as pool:
+                pending = [pool.submit(_highest_between, start, end) for start, end in reversed(parts)]
+                for future in pending:
+                    found = future.result()
+                    if found is not None:
+                        for other in pending:
+                            other.cancel()
+                        return found
+        else:
+            found = _highest_between(lo, hi)
+            if found is not None:
+                return found
+    # Below 2 every number counts as prime (see checkprime)
+    if m <= min(n, 1):
+        return min(n, 1)
     return None
 
-def getAllPrimes(m, n):
-    """Gives all the prime numbers in between a range m, n"""
-    count = 0
-    primeNumbers = []
-    for x in range(m , n + 1):
-        if(checkprime(x)):
-            count += 1
-            primeNumbers.append(x)
-    return count, primeNumbers
+def getAllPrimes(m, n, workers=None):
+    """Gives all the prime numbers in between a range m, n
+
+    workers: number of processes to sieve with (default: this one only)"""
+    # Numbers below 2 count as prime (see checkprime)
+    primeNumbers = list(range(m, min(n, 1) + 1))
+    lo = max(m, 2)
+    parts = _partition(lo, n, workers) if workers and workers > 1 and lo <= n else []
+    if len(parts) > 1:
+        with _pool(workers, n) as pool:
+            for packed in pool.map(_packed_primes, *zip(*parts)):
+                primeNumbers.extend(array("Q", packed))
+    else:
+        primeNumbers.extend(_primes_between(lo, n))
+    return len(primeNumbers), primeNumbers
 
 '''
     NOTES: importing modules will cause the module to be executed where it is imported
@@ -39,8 +196,8 @@ def getAllPrimes(m, n):
 # # Test getAllPrimes()
 # print("100, 200 -> ", getAllPrimes(100, 200))
 
-print("primes.py __name__ = ", __name__)
 if __name__ == "__main__":
+    print("primes.py __name__ = ", __name__)
 
     # Test checkprime()
     print("10 -> ", checkprime(10))
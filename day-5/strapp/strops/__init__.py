@@ -0,0 +1,30 @@
+# The string functions live in strops.strops and are loaded on first use
+# (PEP 562), e.g. "from strops import makeTitle"
+import importlib
+
+_LAZY = {
+    "getspan": ".strops",
+    "reverseWords": ".strops",
+    "removePunctuation": ".strops",
+    "countWords": ".strops",
+    "charecterMap": ".strops",
+    "makeTitle": ".strops",
+    "normalizeSpaces": ".strops",
+    "transform": ".strops",
+    "getPermutations": ".strops",
+    "jumble": ".strops",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))